@@ -0,0 +1,157 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import compact_progress
+
+# --- Analytics Configuration ---
+DAY = np.timedelta64(1, "D")
+GRANULARITIES = ("day", "week", "month", "year")
+
+
+def to_day(value):
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]")
+    if isinstance(value, str):
+        return np.datetime64(value, "D")
+    return np.datetime64(value.isoformat()[:10], "D")
+
+
+def period_starts(start, end, granularity):
+    # First day of every period overlapping [start, end]; weeks start on Monday.
+    start, end = to_day(start), to_day(end)
+    if granularity == "day":
+        return np.arange(start, end + DAY, dtype="datetime64[D]")
+    if granularity == "week":
+        # The datetime64 epoch (1970-01-01) was a Thursday.
+        first = start - np.timedelta64((start.astype(np.int64) + 3) % 7, "D")
+        return np.arange(first, end + DAY, 7 * DAY, dtype="datetime64[D]")
+    if granularity in ("month", "year"):
+        unit = "M" if granularity == "month" else "Y"
+        first, last = start.astype(f"datetime64[{unit}]"), end.astype(f"datetime64[{unit}]")
+        return np.arange(first, last + 1).astype("datetime64[D]")
+    raise ValueError(f"Unknown granularity '{granularity}'. Choose from: {', '.join(GRANULARITIES)}")
+
+
+class ProgressMatrix:
+    # A user's daily_progress as date x goal boolean matrices: `tracked` marks goals recorded
+    # on a day, `completed` marks goals done. Only the user's current goals become columns,
+    # matching the filter calculate_daily_completion has always applied.
+
+    def __init__(self, dates, goals, completed, tracked):
+        self.dates = dates
+        self.goals = list(goals)
+        self.completed = completed
+        self.tracked = tracked
+        done, tracked_count = completed.sum(axis=1), tracked.sum(axis=1)
+        self.percentages = np.divide(done, tracked_count, out=np.zeros(len(done)), where=tracked_count > 0) * 100
+        self.tracked_any = tracked_count > 0
+        self._prefix = None
+        self._aggregates = {}
+
+    @classmethod
+    def from_progress(cls, goals, daily_progress):
+        goals = list(dict.fromkeys(goals))
+        if isinstance(daily_progress, compact_progress.CompactProgress):
+            return cls._from_bit_planes(goals, *daily_progress.bit_planes())
+        goal_positions = {goal: i for i, goal in enumerate(goals)}
+        date_keys = sorted(daily_progress)
+        completed = np.zeros((len(date_keys), len(goals)), dtype=bool)
+        tracked = np.zeros_like(completed)
+        for row, date_str in enumerate(date_keys):
+            day = daily_progress[date_str]
+            for goal, status in day.items():
+                col = goal_positions.get(goal)
+                if col is not None:
+                    tracked[row, col] = True
+                    completed[row, col] = bool(status)
+        dates = np.array(date_keys, dtype="datetime64[D]")
+        return cls(dates, goals, completed, tracked)
+
+    @classmethod
+    def _from_bit_planes(cls, goals, start, stride, plane_goals, buffer):
+        # Unpacks the stored bit planes directly; no per-day dicts are built.
+        planes = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, stride) if stride else np.zeros((1, 0), np.uint8)
+        bits = np.unpackbits(planes, axis=1, bitorder="little").astype(bool)
+        rows = np.flatnonzero(bits[0])
+        goal_positions = {goal: i for i, goal in enumerate(plane_goals)}
+        completed = np.zeros((len(rows), len(goals)), dtype=bool)
+        tracked = np.zeros_like(completed)
+        for col, goal in enumerate(goals):
+            plane = goal_positions.get(goal)
+            if plane is not None:
+                tracked[:, col] = bits[1 + 2 * plane, rows]
+                completed[:, col] = bits[2 + 2 * plane, rows] & tracked[:, col]
+        epoch = datetime.date(1970, 1, 1).toordinal()
+        dates = (rows + (start - epoch)).astype("datetime64[D]")
+        return cls(dates, goals, completed, tracked)
+
+    # --- Aggregates ---
+    def perfect_day_streaks(self, today):
+        # (current, longest) runs of consecutive days with every tracked goal done. As with
+        # goal streaks, the current run is still alive if today or yesterday closes it.
+        today = to_day(today)
+        days = self.dates[(self.percentages >= 100) & self.tracked_any & (self.dates <= today)]
+        if not len(days):
+            return 0, 0
+        breaks = np.flatnonzero(np.diff(days) != DAY) + 1
+        starts = np.concatenate([[0], breaks])
+        lengths = np.diff(np.append(starts, len(days)))
+        current = int(lengths[-1]) if today - days[-1] <= DAY else 0
+        return current, int(lengths.max())
+
+    def _prefix_sums(self):
+        # Running totals over a dense day axis, built once: any range sum is then two lookups.
+        if self._prefix is None:
+            origin = self.dates[0] if len(self.dates) else np.datetime64("1970-01-01", "D")
+            span = int((self.dates[-1] - origin) // DAY) + 1 if len(self.dates) else 0
+            rows = ((self.dates - origin) // DAY).astype(np.int64)
+            dense = np.zeros((span, 2 + 2 * len(self.goals)))
+            dense[rows, 0] = self.tracked_any
+            dense[rows, 1] = np.where(self.tracked_any, self.percentages, 0.0)
+            dense[rows, 2:2 + len(self.goals)] = self.completed
+            dense[rows, 2 + len(self.goals):] = self.tracked
+            self._prefix = (origin, np.vstack([np.zeros((1, dense.shape[1])), np.cumsum(dense, axis=0)]))
+        return self._prefix
+
+    def aggregate(self, start, end, granularity="month", per_goal=False):
+        # Per-period completion over [start, end]: `completion` is the mean over the days that
+        # tracked any current goal, `tracked_days` their count and, with per_goal, each goal's
+        # completion rate. Periods at the edges are clipped to the range. Results are cached.
+        start, end = to_day(start), to_day(end)
+        key = (start, end, granularity, per_goal)
+        if key in self._aggregates:
+            return self._aggregates[key]
+        origin, prefix = self._prefix_sums()
+        period_begin = period_starts(start, end, granularity)
+        next_begin = np.append(period_begin[1:], _next_period(period_begin[-1], granularity))
+        first = np.maximum(period_begin, start)
+        last = np.minimum(next_begin - DAY, end)
+        lo = np.clip((first - origin) // DAY, 0, len(prefix) - 1).astype(np.int64)
+        hi = np.clip((last - origin) // DAY + 1, 0, len(prefix) - 1).astype(np.int64)
+        totals = prefix[hi] - prefix[lo]
+        tracked_days = totals[:, 0]
+        frame = pd.DataFrame(
+            {
+                "completion": np.divide(totals[:, 1], tracked_days, out=np.zeros(len(totals)), where=tracked_days > 0),
+                "tracked_days": tracked_days.astype(np.int64),
+            },
+            index=pd.DatetimeIndex(period_begin, name="period"),
+        )
+        if per_goal:
+            goals = len(self.goals)
+            done, tracked = totals[:, 2:2 + goals], totals[:, 2 + goals:]
+            rates = np.divide(done, tracked, out=np.zeros_like(done), where=tracked > 0) * 100
+            frame = frame.join(pd.DataFrame(rates, index=frame.index, columns=self.goals))
+        self._aggregates[key] = frame
+        return frame
+
+
+def _next_period(begin, granularity):
+    if granularity == "day":
+        return begin + DAY
+    if granularity == "week":
+        return begin + 7 * DAY
+    unit = "M" if granularity == "month" else "Y"
+    return (begin.astype(f"datetime64[{unit}]") + 1).astype("datetime64[D]")
@@ -0,0 +1,443 @@
+import argparse
+import datetime
+import json
+import os
+import queue
+import re
+import signal
+import sys
+import threading
+import traceback
+from collections import namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import auth
+import journal
+import profiling
+import progress_index
+import record_cache
+import storage
+import write_behind
+
+# --- JSON API ---
+# Goals, progress and weekly statistics over HTTP, for mobile apps and bulk importers that
+# should not drive the Streamlit UI. It runs on the app's store stack: the record cache, the
+# progress journal and the write-behind queue, so check-ins are coalesced and appended in the
+# background like the UI's, and reads come from memory. Sign in with POST /api/v1/session
+# and send the returned token as "Authorization: Bearer <token>"; it is the same signed
+# session token the UI uses. Run it standalone (python api_server.py) or inside the
+# Streamlit process with HABIT_TRACKER_API_PORT, where it also shares that process's cache.
+DATA_DIR = "data"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+API_PREFIX = "/api/v1"
+WORKERS = 32                    # connections served at once; more wait for a free worker
+IDLE_TIMEOUT_SECONDS = 30       # a kept-alive connection holds its worker until then
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_RANGE_DAYS = 3660
+FLUSH_WAIT_SECONDS = 10
+RECENT_DAYS = 7
+
+Request = namedtuple("Request", "username params query body client_ip")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def parse_date(value, name):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' must be a date (YYYY-MM-DD).") from None
+
+
+def parse_flag(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+class HabitApi:
+    # The API's operations, independent of HTTP: each handler takes a Request and returns
+    # (status, payload). Errors are raised as ApiError.
+
+    def __init__(self, store, write_queue, registry, flush_timeout=FLUSH_WAIT_SECONDS):
+        self.store = store
+        self.write_queue = write_queue
+        self.registry = registry
+        self.flush_timeout = flush_timeout
+        self.routes = [
+            ("POST", "/session", self.sign_in, False),
+            ("GET", "/health", self.health, False),
+            ("GET", "/goals", self.list_goals, True),
+            ("POST", "/goals", self.add_goal, True),
+            ("DELETE", "/goals/(?P<goal>[^/]+)", self.remove_goal, True),
+            ("GET", "/progress", self.get_progress, True),
+            ("POST", "/progress", self.upsert_days, True),
+            ("PUT", "/progress/(?P<date>[^/]+)", self.upsert_day, True),
+            ("GET", "/stats/weekly", self.weekly_stats, True),
+            ("GET", "/status", self.write_status, True),
+        ]
+        self._patterns = [
+            (method, re.compile(re.escape(API_PREFIX) + pattern + "/?$"), handler, needs_user)
+            for method, pattern, handler, needs_user in self.routes
+        ]
+
+    # --- Dispatch ---
+    def dispatch(self, method, path, query, body, authorization=None, client_ip=None):
+        # (status, payload, headers) for one request; never raises.
+        try:
+            allowed = []
+            for route_method, pattern, handler, needs_user in self._patterns:
+                match = pattern.match(path)
+                if match is None:
+                    continue
+                if route_method != method:
+                    allowed.append(route_method)
+                    continue
+                with profiling.span(f"api.{handler.__name__}"):
+                    username = self.authenticate(authorization) if needs_user else None
+                    params = {name: unquote(value) for name, value in match.groupdict().items()}
+                    status, payload = handler(Request(username, params, query, body, client_ip))
+                return status, payload, {}
+            if allowed:
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {', '.join(allowed)} for {path}.",
+                               {"Allow": ", ".join(allowed)})
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+        except ApiError as e:
+            return e.status, {"error": str(e)}, e.headers
+        except storage.VersionConflict as e:
+            return HTTPStatus.CONFLICT, {"error": str(e)}, {}
+        except storage.StorageError as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, {}
+        except Exception:
+            # The details go to the server's log only: they can hold paths and stored values.
+            print(f"Error handling {method} {path}:\n{traceback.format_exc()}", end="", file=sys.stderr)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}, {}
+
+    def authenticate(self, authorization):
+        scheme, _, token = (authorization or "").partition(" ")
+        username = self.registry.verify_token(token.strip()) if scheme.lower() == "bearer" else None
+        if username is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Sign in first (POST /api/v1/session) and send the token as a Bearer token.",
+                           {"WWW-Authenticate": "Bearer"})
+        return username
+
+    # --- Record access ---
+    def load_record(self, username):
+        # Our own queued writes first, as the UI does before reading.
+        if self.write_queue.status(username)["pending"]:
+            self.write_queue.flush(timeout=self.flush_timeout)
+        return self.store.load_user(username) or storage.empty_user_record()
+
+    def current_goals(self, username):
+        # Goal changes queued by the UI are flushed first; queued check-ins leave the goals
+        # alone, so they are not, and keep coalescing.
+        if self.write_queue.has_pending_record(username):
+            self.write_queue.flush(timeout=self.flush_timeout)
+        return set((self.store.load_user(username) or storage.empty_user_record())["goals"])
+
+    def submit_events(self, username, events, wait):
+        ticket = self.write_queue.submit_progress(username, events, external=True)
+        result = {"accepted": len(events), "ticket": ticket}
+        if not wait:
+            return HTTPStatus.ACCEPTED, result
+        self.write_queue.flush(timeout=self.flush_timeout)
+        status = self.write_queue.status(username)
+        if status["flushed"] < ticket:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE,
+                           f"Accepted but not saved yet: {status['last_error'] or 'timed out'}. It will be retried.")
+        return HTTPStatus.OK, {**result, "durable": True}
+
+    def day_events(self, goals, date_str, statuses):
+        # Events for one day's {goal: true/false/null}; null removes the goal from that day.
+        date_str = parse_date(date_str, "date").isoformat()
+        if not isinstance(statuses, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Progress for {date_str} must be an object of goal -> true/false/null.")
+        events = []
+        for goal, status in statuses.items():
+            if goal not in goals:
+                raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY, f"'{goal}' is not one of your goals.")
+            if status is not None and not isinstance(status, bool):
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"Status for '{goal}' on {date_str} must be true, false or null.")
+            events.append(journal.make_progress_event(date_str, goal, status))
+        return events
+
+    def date_range(self, query, default_days):
+        end = parse_date(query["to"], "to") if "to" in query else datetime.date.today()
+        start = parse_date(query["from"], "from") if "from" in query else end - datetime.timedelta(days=default_days - 1)
+        if start > end or (end - start).days >= MAX_RANGE_DAYS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'from' must not be after 'to', and at most {MAX_RANGE_DAYS} days apart.")
+        return start, end
+
+    # --- Handlers ---
+    def sign_in(self, request):
+        body = request.body if isinstance(request.body, dict) else {}
+        try:
+            username = self.registry.authenticate(body.get("username"), body.get("password"), request.client_ip)
+        except auth.ThrottledError as e:
+            raise ApiError(HTTPStatus.TOO_MANY_REQUESTS, str(e), {"Retry-After": str(int(e.retry_after) + 1)}) from None
+        if username is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Invalid username or password.")
+        return HTTPStatus.OK, {
+            "username": username,
+            "token": self.registry.issue_token(username),
+            "expires_in": self.registry.signer.ttl,
+        }
+
+    def health(self, request):
+        return HTTPStatus.OK, {"status": "ok", "storage": self.store.name}
+
+    def list_goals(self, request):
+        return HTTPStatus.OK, {"goals": self.load_record(request.username)["goals"]}
+
+    def add_goal(self, request):
+        goal = request.body.get("goal") if isinstance(request.body, dict) else None
+        if not isinstance(goal, str) or not goal.strip():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Send {\"goal\": \"<name>\"}.")
+        goal = goal.strip()
+        record = self.load_record(request.username)
+        if goal in record["goals"]:
+            raise ApiError(HTTPStatus.CONFLICT, f"'{goal}' is already one of your goals.")
+        # New goals start without history, as in Goal Setting.
+        mine = {"goals": record["goals"] + [goal], "daily_progress": record["daily_progress"]}
+        merged, _ = storage.save_merged(self.store, request.username, record, mine)
+        return HTTPStatus.CREATED, {"goals": merged["goals"]}
+
+    def remove_goal(self, request):
+        goal = request.params["goal"]
+        record = self.load_record(request.username)
+        if goal not in record["goals"]:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"'{goal}' is not one of your goals.")
+        # Only goals without recorded progress can be removed, as in Goal Setting.
+        if any(goal in statuses for statuses in record["daily_progress"].values()):
+            raise ApiError(HTTPStatus.CONFLICT, f"'{goal}' has recorded progress and cannot be removed.")
+        mine = {"goals": [g for g in record["goals"] if g != goal], "daily_progress": record["daily_progress"]}
+        merged, _ = storage.save_merged(self.store, request.username, record, mine)
+        return HTTPStatus.OK, {"goals": merged["goals"]}
+
+    def get_progress(self, request):
+        start, end = self.date_range(request.query, RECENT_DAYS)
+        daily_progress = self.load_record(request.username)["daily_progress"]
+        days = {}
+        for ordinal in range(start.toordinal(), end.toordinal() + 1):
+            date_str = datetime.date.fromordinal(ordinal).isoformat()
+            statuses = daily_progress.get(date_str)
+            if statuses is not None:
+                days[date_str] = dict(statuses)
+        return HTTPStatus.OK, {"from": start.isoformat(), "to": end.isoformat(), "daily_progress": days}
+
+    def upsert_day(self, request):
+        events = self.day_events(self.current_goals(request.username), request.params["date"], request.body)
+        return self.submit_events(request.username, events, parse_flag(request.query.get("wait")))
+
+    def upsert_days(self, request):
+        # {"days": {"YYYY-MM-DD": {goal: true/false/null}, ...}}: validated as a whole, then
+        # queued as one batch.
+        days = request.body.get("days") if isinstance(request.body, dict) else None
+        if not isinstance(days, dict) or not days:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Send {\"days\": {\"YYYY-MM-DD\": {\"<goal>\": true, ...}}}.")
+        goals = self.current_goals(request.username)
+        events = [event for date_str, statuses in days.items() for event in self.day_events(goals, date_str, statuses)]
+        return self.submit_events(request.username, events, parse_flag(request.query.get("wait")))
+
+    def weekly_stats(self, request):
+        # The Weekly Summary page's numbers for the week (Monday-Sunday) containing `date`.
+        day = parse_date(request.query["date"], "date") if "date" in request.query else datetime.date.today()
+        start = day - datetime.timedelta(days=day.weekday())
+        end = start + datetime.timedelta(days=6)
+        record = self.load_record(request.username)
+        week = {}
+        for ordinal in range(start.toordinal(), end.toordinal() + 1):
+            date_str = datetime.date.fromordinal(ordinal).isoformat()
+            statuses = record["daily_progress"].get(date_str)
+            if statuses is not None:
+                week[date_str] = statuses
+        index = progress_index.ProgressIndex(record["goals"], week)
+        summary = index.week_summary(start)
+        return HTTPStatus.OK, {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": [
+                {"date": date.isoformat(), "weekday": date.strftime("%A"), "completion": round(percentage, 1)}
+                for date, percentage in index.completion_range(start, end)
+            ],
+            "tracked_days": summary["days"],
+            "average": round(summary["average"], 1),
+            "min": round(summary["min"], 1),
+            "max": round(summary["max"], 1),
+        }
+
+    def write_status(self, request):
+        return HTTPStatus.OK, self.write_queue.status(request.username)
+
+
+# --- HTTP transport ---
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so bulk clients reuse one connection
+    server_version = "HabitTrackerAPI/1"
+    timeout = IDLE_TIMEOUT_SECONDS
+    # Headers and body go out in separate writes; with Nagle on, each response would wait
+    # for the client's delayed ACK (~40 ms).
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.handle_api_request()
+
+    do_POST = do_PUT = do_DELETE = do_GET
+
+    def read_body(self):
+        length = self.headers.get("Content-Length")
+        if not length:
+            return None
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body's end is unknown, so the connection cannot be reused.
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer.")
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request bodies are limited to {MAX_BODY_BYTES} bytes.")
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "The request body is not valid JSON.") from None
+
+    def handle_api_request(self):
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            body = self.read_body()
+        except ApiError as e:
+            status, payload, headers = e.status, {"error": str(e)}, e.headers
+        else:
+            status, payload, headers = self.server.api.dispatch(
+                self.command, url.path, query, body, self.headers.get("Authorization"), self.client_address[0]
+            )
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+
+class ApiServer(HTTPServer):
+    # Connections are handed to a fixed pool of daemon worker threads instead of a thread
+    # each, so load is bounded and per-thread resources (SQLite connections) are reused.
+    request_queue_size = 128
+
+    def __init__(self, address, api, workers=WORKERS, access_log=False):
+        self.api = api
+        self.access_log = access_log
+        self._connections = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"api-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        super().__init__(address, ApiRequestHandler)
+        for worker in self._workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        self._connections.put((request, client_address))
+
+    def _work(self):
+        while True:
+            item = self._connections.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._workers:
+            self._connections.put(None)
+
+
+def build_api(data_dir, backend_name=None, flush_interval=write_behind.FLUSH_INTERVAL_SECONDS,
+              scheme=auth.DEFAULT_SCHEME, cost=None):
+    # A standalone store stack, as the app builds it (see app_pages.common).
+    store = record_cache.CachedStorage(journal.get_journaled_storage(storage.get_storage(data_dir, backend_name)))
+    registry = auth.UserRegistry(store, auth.load_secret(data_dir), scheme, cost)
+    return HabitApi(store, write_behind.WriteBehindQueue(store, flush_interval), registry)
+
+
+def serve_in_background(api, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=WORKERS):
+    # Starts serving on a daemon thread; port 0 picks a free port (see server.server_address).
+    server = ApiServer((host, port), api, workers)
+    threading.Thread(target=server.serve_forever, name="api-server", daemon=True).start()
+    return server
+
+
+# --- Command line ---
+def build_parser():
+    parser = argparse.ArgumentParser(description="Serve the Habit Tracker JSON API.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--storage",
+        choices=sorted(storage.BACKENDS),
+        default=os.environ.get("HABIT_TRACKER_STORAGE", storage.DEFAULT_BACKEND),
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Connections served at once.")
+    parser.add_argument(
+        "--flush-seconds", type=float,
+        default=float(os.environ.get("HABIT_TRACKER_FLUSH_SECONDS", write_behind.FLUSH_INTERVAL_SECONDS)),
+        help="Seconds between background flushes of queued check-ins; 0 writes synchronously.",
+    )
+    parser.add_argument("--access-log", action="store_true", help="Log every request to stderr.")
+    return parser
+
+
+def stop_serving(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        api = build_api(
+            args.data_dir, args.storage, args.flush_seconds,
+            os.environ.get("HABIT_TRACKER_PASSWORD_SCHEME", auth.DEFAULT_SCHEME),
+            int(os.environ.get("HABIT_TRACKER_PASSWORD_COST", 0)) or None,
+        )
+        server = ApiServer((args.host, args.port), api, args.workers, args.access_log)
+    except (auth.AuthError, storage.StorageError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    host, port = server.server_address[:2]
+    print(f"Serving the Habit Tracker API on http://{host}:{port}{API_PREFIX} ({api.store.name} storage)", flush=True)
+    # Stopped like Ctrl-C, so queued check-ins are flushed before exit.
+    signal.signal(signal.SIGTERM, stop_serving)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        api.write_queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import importlib
+
+# --- Page Registry ---
+# Menu label -> page module in this package. Each module has a render() function and is
+# imported the first time its page is opened, together with whatever it alone needs.
+PAGES = {
+    "Home": "home",
+    "Goal Setting": "goal_setting",
+    "Goal Tracking": "goal_tracking",
+    "Quote of the Day": "quote_of_the_day",
+    "Progress Reports": "progress_reports",
+    "Weekly Summary": "weekly_summary",
+    "Calendar & Trends": "calendar_trends",
+    "Team": "team",
+}
+
+
+def load_page(module_name):
+    return importlib.import_module(f"{__name__}.{module_name}")
@@ -0,0 +1,74 @@
+import calendar
+import datetime
+
+import streamlit as st
+
+import analytics
+import calendar_views
+import profiling
+from app_pages import common
+
+
+@profiling.timed("index.get_progress_matrix")
+def get_progress_matrix():
+    # Built lazily for the long-range views and dropped whenever progress or goals change;
+    # it caches its own per-period aggregates.
+    if 'progress_matrix' not in st.session_state:
+        st.session_state.progress_matrix = analytics.ProgressMatrix.from_progress(
+            st.session_state.goals, st.session_state.daily_progress
+        )
+    return st.session_state.progress_matrix
+
+@profiling.timed("page.calendar_trends")
+def render():
+    common.set_page_background_image("Calendar & Trends")
+    st.title("Calendar & Trends")
+
+    if not st.session_state.goals:
+        st.info("No goals set yet. Set goals and track them to see your calendar!")
+        return
+
+    matrix = get_progress_matrix()
+    today = datetime.date.today()
+    first_year = int(str(matrix.dates[0])[:4]) if len(matrix.dates) else today.year
+    years = list(range(today.year, min(first_year, today.year) - 1, -1))
+
+    view = st.radio("View", ["Year", "Month"], horizontal=True, key="calendar_view")
+    year = st.selectbox("Year", years, key="calendar_year")
+    if view == "Year":
+        start, end = datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+        trend_granularity = st.radio("Trend by", ["week", "month"], horizontal=True, key="calendar_trend")
+    else:
+        month = st.selectbox(
+            "Month", list(range(1, 13)), index=today.month - 1 if year == today.year else 0,
+            format_func=lambda m: calendar.month_name[m], key="calendar_month",
+        )
+        start = datetime.date(year, month, 1)
+        end = datetime.date(year, month, calendar.monthrange(year, month)[1])
+        trend_granularity = "day"
+
+    days = matrix.aggregate(start, end, "day")
+    completion = {day.date(): value for day, value in days["completion"].items()}
+    tracked = {day.date(): bool(count) for day, count in days["tracked_days"].items()}
+    period = matrix.aggregate(start, end, "year" if view == "Year" else "month")
+
+    st.markdown("---")
+    if view == "Year":
+        st.subheader(f"{year} at a glance")
+        st.markdown(calendar_views.year_heatmap_html(completion, tracked, start, end), unsafe_allow_html=True)
+    else:
+        st.subheader(f"{calendar.month_name[start.month]} {year}")
+        st.markdown(calendar_views.month_calendar_html(completion, tracked, year, start.month), unsafe_allow_html=True)
+
+    tracked_days = int(period["tracked_days"].sum())
+    st.write(f"**Days Tracked:** {tracked_days}")
+    st.write(f"**Average Daily Completion:** {period['completion'].iloc[0] if tracked_days else 0:.0f}%")
+
+    st.subheader("Trends:")
+    trend = matrix.aggregate(start, end, trend_granularity, per_goal=True)
+    trend = trend[trend["tracked_days"] > 0]
+    if trend.empty:
+        st.info("No goals were tracked in this period.")
+        return
+    st.line_chart(trend[["completion"]].rename(columns={"completion": "All goals"}))
+    st.line_chart(trend[st.session_state.goals])
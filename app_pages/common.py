@@ -0,0 +1,351 @@
+import copy
+import datetime
+import os
+import uuid
+
+import streamlit as st
+
+import assets
+import auth
+import journal
+import profiling
+import progress_index
+import quotes
+import record_cache
+import storage
+import write_behind
+
+# Shared by the main script and every page module: configuration, storage access and
+# session-state helpers. Only lightweight modules are imported here; pages import their own
+# heavy dependencies (pandas, numpy) so they load when the page is first opened.
+
+# --- Configuration and File Paths ---
+APP_TITLE = "Habit Tracker"
+DATA_DIR = "data"
+QUOTES_FILE = os.path.join(DATA_DIR, "quotes.txt")
+USER_DATA_FILE = os.path.join(DATA_DIR, "user_data.json")
+# "shards" (one JSON file per user), "sqlite", "history" (one memory-mapped file with a user index)
+# or "json" (the original single file)
+STORAGE_BACKEND = os.environ.get("HABIT_TRACKER_STORAGE", storage.DEFAULT_BACKEND)
+# Seconds between background flushes of saved progress and goals; 0 writes synchronously
+FLUSH_INTERVAL = float(os.environ.get("HABIT_TRACKER_FLUSH_SECONDS", write_behind.FLUSH_INTERVAL_SECONDS))
+# Users who may open the profiling panel in the sidebar and rebuild the team leaderboard
+# (comma-separated; nobody unless set)
+PROFILING_ADMINS = {u.strip() for u in os.environ.get("HABIT_TRACKER_ADMINS", "").split(",") if u.strip()}
+# Optional path that receives one JSON line of span timings per rerun
+PROFILE_LOG_FILE = os.environ.get("HABIT_TRACKER_PROFILE_LOG")
+# Hash for new and upgraded passwords: "pbkdf2_sha256" or "scrypt", and its cost
+# (PBKDF2 iterations or log2 of scrypt's N; 0 uses the default for the scheme)
+PASSWORD_SCHEME = os.environ.get("HABIT_TRACKER_PASSWORD_SCHEME", auth.DEFAULT_SCHEME)
+PASSWORD_COST = int(os.environ.get("HABIT_TRACKER_PASSWORD_COST", 0)) or None
+# Port for the JSON API (api_server.py) served from this process, on its store, cache and write
+# queue; unset leaves the API off
+API_PORT = int(os.environ.get("HABIT_TRACKER_API_PORT", 0)) or None
+API_HOST = os.environ.get("HABIT_TRACKER_API_HOST", "127.0.0.1")
+
+# --- Starting Credentials ---
+# Password hashes these accounts get on first run unless the store already has one for them
+# (e.g. from user_data.json). Change a password with `python auth.py set-password <user>`.
+SEED_PASSWORD_HASHES = {
+    "mohit": "pbkdf2_sha256$600000$fWqn85Fu+BiIWJkjvqzdww$m7R7FY3XZ5t+E8gdpfg7UoX2QuNOoyK5rO0VVpiSNeI",
+    "muskan": "pbkdf2_sha256$600000$P8xd6XdQTbVJ2otB3OYv3A$NbyKw0W6zDdEZZTt5XbM47YGdomT+Djc00+WNwZrIz0",
+    "minal": "pbkdf2_sha256$600000$ibOoMq3Wl1uqzFQ9z2A9MA$L3MVhyMJ85Dyn6k99CTDbY5yLMScPQzaOPN92T+XLus",
+    "simran": "pbkdf2_sha256$600000$XlcrZ+GWiKH12jiQNfYlWA$gF988OVSXVxhDCdPL5It7hSQ29HI/jjRlsvDZmickCQ",
+    "dhruv": "pbkdf2_sha256$600000$9xJMbqRMramKe3fMdURJNQ$BlwBZqm8qo1n7kwh6JmXES93S81Ny7h23O0r3QcQG2U",
+}
+
+# Define paths for background images for each page
+BACKGROUND_IMAGES = {
+    "Login": os.path.join("images", "welcome_bg.jpg"),
+    "Home": os.path.join("images", "welcome_bg.jpg"),
+    "Goal Tracking": os.path.join("images", "goal_tracking_bg.jpg"),
+    "Goal Setting": os.path.join("images", "goal_setting_bg.jpg"),
+    "Quote of the Day": os.path.join("images", "quotes_bg.jpg"),
+    "Progress Reports": os.path.join("images", "progress_reports_bg.jpg"),
+    "Weekly Summary": os.path.join("images", "weekly_summary_bg.jpg"),
+    "Calendar & Trends": os.path.join("images", "progress_reports_bg.jpg"),
+    "Team": os.path.join("images", "weekly_summary_bg.jpg"),
+    "Default": os.path.join("images", "default_bg.jpg")
+}
+
+# --- IMPORTANT: THIS IS WHERE THE SUGGESTED HABITS ARE DEFINED ---
+SUGGESTED_HABITS = [
+    "Drink 8 glasses of water",
+    "Exercise for 30 minutes",
+    "Read for 15 minutes",
+    "Meditate for 10 minutes",
+    "Journal for 5 minutes",
+    "Take a 15-minute walk",
+    "Learn a new skill",
+    "Practice gratitude",
+    "Go to bed before 11 PM",
+    "Wake up before 7 AM"
+]
+
+# --- Helper Functions for Data Persistence ---
+@st.cache_resource
+def get_shared_storage(data_dir, backend_name):
+    # One record cache per process, shared by every session; only the first read of a user touches disk.
+    return record_cache.CachedStorage(journal.get_journaled_storage(storage.get_storage(data_dir, backend_name)))
+
+@st.cache_resource
+def get_shared_write_queue(data_dir, backend_name, flush_interval):
+    # One background writer per process, in front of the shared store.
+    return write_behind.WriteBehindQueue(get_shared_storage(data_dir, backend_name), flush_interval)
+
+@st.cache_resource
+def get_quote_book(path):
+    # One quote index per process; it re-checks the file every few seconds, so edits show up without a restart.
+    return quotes.QuoteBook(path)
+
+@st.cache_resource
+def get_shared_user_registry(data_dir, backend_name, scheme, cost):
+    # Shared so login throttling sees every session's attempts in this process.
+    registry = auth.UserRegistry(get_shared_storage(data_dir, backend_name), auth.load_secret(data_dir), scheme, cost)
+    registry.seed(SEED_PASSWORD_HASHES)
+    return registry
+
+def get_user_registry():
+    return get_shared_user_registry(DATA_DIR, STORAGE_BACKEND, PASSWORD_SCHEME, PASSWORD_COST)
+
+@st.cache_resource
+def start_api_server(host, port):
+    # Once per process. Imported here so the app does not load the HTTP stack when the API is off.
+    import api_server
+    api = api_server.HabitApi(
+        get_shared_storage(DATA_DIR, STORAGE_BACKEND),
+        get_shared_write_queue(DATA_DIR, STORAGE_BACKEND, FLUSH_INTERVAL),
+        get_user_registry(),
+    )
+    return api_server.serve_in_background(api, host, port)
+
+def client_ip():
+    try:
+        return st.context.ip_address
+    except Exception:
+        return None
+
+def session_is_valid():
+    # A signed token check on every rerun: cheap, and it ends sessions whose token expired or
+    # whose password has changed since.
+    try:
+        username = get_user_registry().verify_token(st.session_state.get('session_token'))
+    except Exception:
+        return False
+    return username is not None and username == st.session_state.get('username')
+
+def get_write_queue():
+    return get_shared_write_queue(DATA_DIR, STORAGE_BACKEND, FLUSH_INTERVAL)
+
+def get_storage():
+    backend = get_shared_storage(DATA_DIR, STORAGE_BACKEND)
+    if backend.migration_error is not None:
+        st.warning(f"Could not migrate {USER_DATA_FILE} to the '{backend.name}' store: {backend.migration_error}")
+    return backend
+
+def remember_base_record(record):
+    # The last stored state this session has seen; saves merge against it (see storage.save_merged).
+    st.session_state.base_record = copy.deepcopy(record or storage.empty_user_record())
+
+@profiling.timed("storage.get_current_user_data")
+def get_current_user_data():
+    current_username = st.session_state.get('username')
+    if not current_username:
+        return [], {}
+    try:
+        # Read our own queued writes back, not the state from before them.
+        if get_write_queue().status(current_username)['pending']:
+            get_write_queue().flush(timeout=10)
+        record = get_storage().load_user(current_username)
+    except Exception as e:
+        st.warning(f"Error loading data for {current_username}: {e}. Starting with empty data structure.")
+        return [], {}
+    remember_base_record(record)
+    if record is None:
+        return [], {}
+    return record.get('goals', []), record.get('daily_progress', {})
+
+@profiling.timed("storage.update_current_user_data")
+def update_current_user_data(goals, daily_progress):
+    current_username = st.session_state.get('username')
+
+    if current_username:
+        base = st.session_state.get('base_record')
+        mine = {'goals': goals, 'daily_progress': daily_progress}
+        try:
+            # Merged into the stored record in the background (see sync_saved_changes).
+            st.session_state.write_ticket = get_write_queue().submit_record(
+                current_username, base, mine, source=st.session_state.setdefault('session_key', uuid.uuid4().hex)
+            )
+        except Exception as e:
+            st.error(f"Error saving data for {current_username}: {e}")
+            return
+        remember_base_record(mine)
+    else:
+        st.error("Cannot save data: No user is currently logged in.")
+
+@profiling.timed("storage.record_daily_progress")
+def record_daily_progress(date_str, statuses):
+    # Appends only this day's changes to the progress journal instead of rewriting the whole history.
+    current_username = st.session_state.get('username')
+    if not current_username:
+        st.error("Cannot save data: No user is currently logged in.")
+        return
+    previous = st.session_state.daily_progress.get(date_str, {})
+    events = [journal.make_progress_event(date_str, goal, status) for goal, status in statuses.items()]
+    events.extend(journal.make_progress_event(date_str, goal, None) for goal in previous if goal not in statuses)
+    try:
+        st.session_state.write_ticket = get_write_queue().submit_progress(current_username, events)
+    except Exception as e:
+        st.error(f"Error saving data for {current_username}: {e}")
+        return
+    st.session_state.daily_progress[date_str] = statuses
+    if 'base_record' in st.session_state:
+        st.session_state.base_record.setdefault('daily_progress', {})[date_str] = dict(statuses)
+    refresh_progress_index(date_str, previous)
+
+def sync_saved_changes():
+    # Once this session's writes are durable, pick up whatever the background merges brought
+    # in from other sessions.
+    status = get_write_queue().status(st.session_state['username'])
+    if status['flushed'] < st.session_state.get('write_ticket', 0):
+        return status
+    if status['external'] > st.session_state.get('synced_ticket', 0):
+        st.session_state.goals, st.session_state.daily_progress = get_current_user_data()
+        refresh_progress_index()
+        new_conflicts = status['conflicts'] - st.session_state.get('synced_conflicts', 0)
+        if new_conflicts:
+            st.warning(f"{new_conflicts} entr{'y was' if new_conflicts == 1 else 'ies were'} also changed in another session; your changes were kept.")
+    st.session_state.synced_ticket = status['flushed']
+    st.session_state.synced_conflicts = status['conflicts']
+    return status
+
+def render_save_status(status):
+    if status['last_error']:
+        st.warning(f"Changes not saved yet, retrying: {status['last_error']}")
+    elif status['pending']:
+        st.caption(f"⏳ Saving {status['pending']} change(s)…")
+    elif status['last_flush'] is not None:
+        saved_at = datetime.datetime.fromtimestamp(status['last_flush']).strftime('%H:%M:%S')
+        st.caption(f"✅ All changes saved ({saved_at})")
+
+def init_session_state_for_user():
+    if 'logged_in' in st.session_state and st.session_state.logged_in and 'goals' not in st.session_state:
+        st.session_state.goals, st.session_state.daily_progress = get_current_user_data()
+        refresh_progress_index()
+        status = get_write_queue().status(st.session_state['username'])
+        st.session_state.synced_ticket, st.session_state.synced_conflicts = status['flushed'], status['conflicts']
+        st.session_state.current_page = "Home"
+
+def use_static_backgrounds():
+    # Serve backgrounds as app/static URLs when static serving is on (see .streamlit/config.toml),
+    # otherwise fall back to inline base64 data URIs.
+    mode = os.environ.get("HABIT_TRACKER_BACKGROUNDS", "auto")
+    if mode == "auto":
+        return bool(st.get_option("server.enableStaticServing"))
+    return mode == "static"
+
+@profiling.timed("assets.set_page_background_image")
+def set_page_background_image(page_name):
+    image_path = BACKGROUND_IMAGES.get(page_name, BACKGROUND_IMAGES["Default"])
+
+    try:
+        if not os.path.exists(image_path):
+            st.warning(f"Background image not found for '{page_name}' at {image_path}. Using default background.")
+            image_path = BACKGROUND_IMAGES["Default"]
+
+        background_css = assets.background_css(image_path, use_static_url=use_static_backgrounds())
+        st.markdown(background_css, unsafe_allow_html=True)
+    except FileNotFoundError:
+        st.warning(f"Default background image not found at {image_path}. No background image will be set.")
+    except Exception as e:
+        st.error(f"An error occurred while setting background image: {e}")
+
+@profiling.timed("assets.load_image_for_page")
+def load_image_for_page(image_name):
+    image_path = os.path.join("images", image_name)
+    if os.path.exists(image_path):
+        st.image(image_path, use_container_width=True)
+    else:
+        st.warning(f"Image '{image_name}' not found in images/ folder.")
+
+def get_quote_tags():
+    try:
+        return sorted(get_quote_book(QUOTES_FILE).tags())
+    except (OSError, ValueError):
+        return []
+
+def get_daily_quote(tag=None):
+    # Fixed for the day and the signed-in user; drawn from the tag's quotes when one is given.
+    try:
+        quote = get_quote_book(QUOTES_FILE).daily_quote(username=st.session_state.get('username'), tag=tag)
+    except FileNotFoundError:
+        st.error(f"Error: {QUOTES_FILE} not found. Please create it and add quotes.")
+        return "Error loading quotes."
+    except (OSError, ValueError) as e:
+        st.error(f"An error occurred while loading quotes: {e}. Please check the file encoding.")
+        return "Error loading quotes."
+    return quote.text if quote else "No quotes found. Please add some to quotes.txt."
+
+@profiling.timed("index.refresh_progress_index")
+def refresh_progress_index(date_str=None, previous=None):
+    # Rebuilt from scratch when goals change; a single saved day is folded in incrementally,
+    # given that day's entry from before the save.
+    index = st.session_state.get('progress_index')
+    if index is None or date_str is None:
+        st.session_state.progress_index = progress_index.ProgressIndex(st.session_state.goals, st.session_state.daily_progress)
+    else:
+        index.update_day(date_str, st.session_state.daily_progress, previous)
+    st.session_state.pop('progress_matrix', None)
+
+def get_progress_index():
+    if 'progress_index' not in st.session_state:
+        refresh_progress_index()
+    return st.session_state.progress_index
+
+def add_goal(goal):
+    # New goals start without history: past days are not backfilled with False.
+    if get_progress_index().add_goal(goal, st.session_state.daily_progress):
+        st.session_state.goals.append(goal)
+        st.session_state.pop('progress_matrix', None)
+
+def remove_goal(goal):
+    # Only goals without recorded progress can be removed, so no day needs rewriting.
+    if get_progress_index().remove_goal(goal, st.session_state.daily_progress):
+        st.session_state.goals.remove(goal)
+        st.session_state.pop('progress_matrix', None)
+
+def calculate_daily_completion(date_str):
+    return get_progress_index().completion_on(datetime.date.fromisoformat(date_str))
+
+def get_progress_color(percentage):
+    if percentage >= 76:
+        return "green"
+    elif percentage >= 51:
+        return "orange"
+    else:
+        return "red"
+
+def get_motivational_message(average_completion):
+    user_name_display = st.session_state.get('username', 'Habit Tracker User')
+    if average_completion >= 80:
+        return (
+            f"🚀 **Fantastic work, {user_name_display}!** Your dedication is truly shining through. "
+            "Keep this incredible momentum going – you're building habits that will transform your life!"
+        )
+    elif average_completion >= 50:
+        return (
+            f"✨ **Great effort, {user_name_display}!** You're consistently showing up, and that's the key. "
+            "Remember, every step forward, no matter how small, leads to big changes. You're on the right path!"
+        )
+    elif st.session_state.goals:
+        return (
+            f"💪 **Keep pushing, {user_name_display}!** Even if things felt challenging, remember that consistency beats perfection. "
+            "Identify one small change you can make today to get back on track. You've got the power to make it happen!"
+        )
+    else:
+        return (
+            f"👋 **Welcome, {user_name_display}!** Ready to unlock your full potential? "
+            "Start by setting your first goal on the 'Goal Setting' page. "
+            "Small steps lead to big victories!"
+        )
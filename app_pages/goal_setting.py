@@ -0,0 +1,69 @@
+import streamlit as st
+
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.goal_setting")
+def render():
+    common.set_page_background_image("Goal Setting")
+    st.title("Goal Setting")
+    
+    st.write("Here you can manage your habits. Choose from suggestions or add your own!")
+
+    st.subheader("Add from Suggestions:") # Always show this header
+    
+    goal_index = common.get_progress_index().goals
+    available_suggestions = [habit for habit in common.SUGGESTED_HABITS if habit not in goal_index]
+    
+    if available_suggestions: # Only show the multiselect if there are suggestions
+        selected_suggestions = st.multiselect(
+            "Select habits to add:",
+            options=available_suggestions,
+            key="suggested_habits_multiselect"
+        )
+        if st.button("Add Selected Suggestions"):
+            if selected_suggestions:
+                for habit in selected_suggestions:
+                    common.add_goal(habit)
+                common.update_current_user_data(st.session_state.goals, st.session_state.daily_progress)
+                st.success(f"Added {len(selected_suggestions)} suggested habit(s)!")
+                st.rerun()
+            else:
+                st.info("Please select at least one habit from the suggestions.")
+    else: # If no available suggestions, show a message
+        st.info("All suggested habits are already in your active goals!")
+
+
+    st.subheader("Add Your Own Custom Goal:")
+    new_goal = st.text_input("New Goal:", key="new_goal_input")
+    if st.button("Add Custom Goal"):
+        if new_goal and new_goal not in goal_index:
+            common.add_goal(new_goal)
+            common.update_current_user_data(st.session_state.goals, st.session_state.daily_progress)
+            st.success(f"Goal '{new_goal}' added!")
+            st.rerun()
+        elif new_goal in goal_index:
+            st.warning("This goal already exists!")
+        else:
+            st.warning("Please enter a goal.")
+
+    st.subheader("Your Current Goals:")
+    if st.session_state.goals:
+        goals_copy = st.session_state.goals[:]
+        for i, goal in enumerate(goals_copy):
+            col1, col2 = st.columns([0.8, 0.2])
+            with col1:
+                st.write(f"- {goal}")
+            with col2:
+                tracked = goal_index.tracked_range(goal)
+                if tracked:
+                    st.button(f"Cannot Remove", key=f"remove_goal_{i}", disabled=True, help=f"This goal has progress recorded from {tracked[0]} to {tracked[1]} and cannot be removed.")
+                else:
+                    if st.button(f"Remove", key=f"remove_goal_{i}"):
+                        common.remove_goal(goal)
+                        common.update_current_user_data(st.session_state.goals, st.session_state.daily_progress)
+                        st.success(f"Goal '{goal}' removed.")
+                        st.rerun()
+    else:
+        st.info("No goals set yet. Start by adding some!")
@@ -0,0 +1,58 @@
+import datetime
+
+import streamlit as st
+
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.goal_tracking")
+def render():
+    common.set_page_background_image("Goal Tracking")
+    st.title("Goal Tracking for Today")
+    
+    today_str = datetime.date.today().strftime("%Y-%m-%d")
+    st.write(f"Mark the goals you completed on {today_str}.")
+
+    if not st.session_state.goals:
+        st.warning("You haven't set any goals yet! Please go to 'Goal Setting' to add your goals.")
+        st.session_state.current_page = "Goal Setting"
+        st.rerun()
+        return
+
+    if today_str not in st.session_state.daily_progress:
+        st.session_state.daily_progress[today_str] = {}
+    today_before = dict(st.session_state.daily_progress[today_str])
+
+    for goal in st.session_state.goals:
+        if goal not in st.session_state.daily_progress[today_str]:
+            st.session_state.daily_progress[today_str][goal] = False
+    
+    goal_index = common.get_progress_index().goals
+    goals_to_remove = [g for g in st.session_state.daily_progress[today_str] if g not in goal_index]
+    for g in goals_to_remove:
+        del st.session_state.daily_progress[today_str][g]
+    if st.session_state.daily_progress[today_str] != today_before:
+        common.refresh_progress_index(today_str, today_before)
+
+    st.subheader("Today's Goals:")
+    updated_progress_for_today = {}
+
+    sorted_goals = sorted(st.session_state.goals)
+
+    for goal in sorted_goals:
+        is_completed = st.checkbox(
+            f"{goal}",
+            value=st.session_state.daily_progress[today_str].get(goal, False),
+            key=f"checkbox_{today_str}_{goal}"
+        )
+        updated_progress_for_today[goal] = is_completed
+
+    if st.button("Save Today's Progress"):
+        common.record_daily_progress(today_str, updated_progress_for_today)
+        st.success("Today's progress saved!")
+        st.rerun()
+
+    completion_percentage = common.calculate_daily_completion(today_str)
+    st.markdown(f"**Today's Completion:** {completion_percentage:.0f}%")
+    st.progress(completion_percentage / 100)
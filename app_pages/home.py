@@ -0,0 +1,25 @@
+import datetime
+
+import streamlit as st
+
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.home")
+def render():
+    common.set_page_background_image("Home")
+    st.title(f"Welcome, {st.session_state['username']}!")
+    
+    avg_recent_completion = 0
+    if st.session_state.goals:
+        avg_recent_completion = common.get_progress_index().recent_average(7, datetime.date.today())
+
+    st.markdown(common.get_motivational_message(avg_recent_completion))
+
+    if st.session_state.goals:
+        st.subheader("Your Streaks:")
+        for goal, streak in common.get_progress_index().goal_streaks(datetime.date.today()).items():
+            st.write(f"- **{goal}**: {streak['current']} day(s) in a row (best: {streak['longest']})")
+    st.markdown("---")
+    st.markdown("Use the sidebar to navigate through the app.")
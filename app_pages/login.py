@@ -0,0 +1,42 @@
+import math
+
+import streamlit as st
+
+import auth
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.login")
+def render():
+    common.set_page_background_image("Login")
+    st.title("Habit Tracker - Login")
+    common.load_image_for_page("login.jpg")
+
+    username_input = st.text_input("Username", key="login_username")
+    password_input = st.text_input("Password", type="password", key="login_password")
+    login_button = st.button("Login")
+
+    if st.session_state.pop("session_expired", False):
+        st.info("Your session has ended. Please log in again.")
+
+    if login_button:
+        registry = common.get_user_registry()
+        try:
+            username = registry.authenticate(username_input, password_input, client_ip=common.client_ip())
+        except auth.ThrottledError as e:
+            st.error(f"Too many failed login attempts. Please try again in {math.ceil(e.retry_after / 60)} minute(s).")
+            return
+        except Exception as e:
+            st.error(f"Could not check your password: {e}")
+            return
+        if username:
+            st.session_state["logged_in"] = True
+            st.session_state["username"] = username
+            # Reruns check this signed token instead of hashing the password again.
+            st.session_state["session_token"] = registry.issue_token(username)
+            common.init_session_state_for_user()
+            st.success("Logged in successfully!")
+            st.rerun()
+        else:
+            st.error("Invalid username or password.")
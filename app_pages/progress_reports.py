@@ -0,0 +1,43 @@
+import datetime
+
+import streamlit as st
+
+import html_tables
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.progress_reports")
+def render():
+    common.set_page_background_image("Progress Reports")
+    st.title("Daily Progress Overview")
+    
+    st.subheader("Last 7 Days of Completion")
+
+    st.markdown("""
+        <style>
+        .dataframe td.completion-red { color: red; font-weight: bold; }
+        .dataframe td.completion-orange { color: orange; font-weight: bold; }
+        .dataframe td.completion-green { color: green; font-weight: bold; }
+        </style>
+    """, unsafe_allow_html=True)
+
+    today = datetime.date.today()
+    report_data = []
+
+    for date_to_report, percentage in common.get_progress_index().completion_range(today - datetime.timedelta(days=6), today):
+        display_date = date_to_report.strftime("%A, %b %d, %Y")
+        color = common.get_progress_color(percentage)
+        
+        report_data.append({
+            "Date": display_date,
+            "Completion (%)": f"<span style='color:{color};'>{percentage:.0f}%</span>"
+        })
+    with profiling.span("page.progress_reports.table"):
+        st.markdown(html_tables.table_html(report_data, escape=False), unsafe_allow_html=True)
+    st.write(f"**{today.strftime('%B')} Average Completion:** {common.get_progress_index().month_average(today.year, today.month):.0f}%")
+
+    if not st.session_state.daily_progress and not st.session_state.goals:
+        st.info("No tracking data or goals set yet. Start by setting goals and tracking them!")
+    elif not st.session_state.daily_progress:
+        st.info("No tracking data available yet for your goals. Start tracking your goals!")
@@ -0,0 +1,28 @@
+import html
+
+import streamlit as st
+
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.quote_of_the_day")
+def render():
+    common.set_page_background_image("Quote of the Day")
+    st.title("Quote of the Day")
+    
+    tag = None
+    tags = common.get_quote_tags()
+    if tags:
+        tag = st.selectbox(
+            "Category", [None] + tags, key="quote_category",
+            format_func=lambda t: "Any" if t is None else t.title(),
+        )
+
+    st.markdown("---")
+    quote = common.get_daily_quote(tag)
+    st.markdown(
+        f"<h2 style='text-align: center; font-weight: bold; font-size: 2em;'>\"{html.escape(quote)}\"</h2>",
+        unsafe_allow_html=True
+    )
+    st.markdown("---")
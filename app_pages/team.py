@@ -0,0 +1,66 @@
+import pandas as pd
+import streamlit as st
+
+import leaderboard
+import profiling
+import storage
+from app_pages import common
+
+# --- Team Page Configuration ---
+# Rows shown in the leaderboard; the summary file itself ranks every user
+TEAM_LEADERBOARD_ROWS = 25
+
+
+@st.cache_resource(max_entries=1)
+def load_team_summary(data_dir, stamp):
+    # Keyed by the summary file's stamp, so a rebuild by the batch job is picked up on the next rerun.
+    return leaderboard.load_summary(data_dir)
+
+@profiling.timed("page.team")
+def render():
+    common.set_page_background_image("Team")
+    st.title("Team Leaderboard")
+
+    if st.session_state.username in common.PROFILING_ADMINS and st.button("Rebuild leaderboard now"):
+        common.get_write_queue().flush(timeout=10)
+        try:
+            with st.spinner("Ranking every user..."):
+                leaderboard.build_leaderboard(common.DATA_DIR, common.STORAGE_BACKEND, workers=1)
+        except (storage.StorageError, OSError, ValueError) as e:
+            st.error(f"Could not rebuild the leaderboard: {e}")
+
+    try:
+        summary = load_team_summary(common.DATA_DIR, storage.file_stamp(leaderboard.summary_path(common.DATA_DIR)))
+    except (OSError, ValueError) as e:
+        st.warning(f"Could not read the team leaderboard: {e}")
+        return
+    if summary is None:
+        st.info("The team leaderboard has not been computed yet. It is built by `python leaderboard.py`.")
+        return
+
+    st.caption(
+        f"Last {summary['window_days']} days as of {summary['as_of']} "
+        f"(computed {summary['generated_at']} for {len(summary['users'])} users)."
+    )
+    me = next((row for row in summary['users'] if row['username'] == st.session_state.username), None)
+    if me is not None:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Your Rank", f"#{me['rank']} of {len(summary['users'])}")
+        col2.metric("Your Completion", f"{me['completion']:.0f}%")
+        col3.metric("Perfect-day Streak", f"{me['current_streak']} day(s)")
+
+    st.subheader("Teams:")
+    teams = pd.DataFrame(summary['teams'], columns=["rank", "team", "members", "active_members", "completion", "best_streak", "top_user"])
+    teams.columns = ["Rank", "Team", "Members", "Active", "Completion (%)", "Best Streak", "Top Member"]
+    st.dataframe(teams, hide_index=True, use_container_width=True)
+
+    st.subheader("Leaderboard:")
+    team_names = [team['team'] for team in summary['teams']]
+    shown_team = st.selectbox("Team", ["All teams"] + team_names, key="team_filter")
+    users = summary['users'] if shown_team == "All teams" else [row for row in summary['users'] if row['team'] == shown_team]
+    board = pd.DataFrame(
+        users[:TEAM_LEADERBOARD_ROWS],
+        columns=["rank", "username", "team", "completion", "tracked_days", "current_streak", "longest_streak"],
+    )
+    board.columns = ["Rank", "User", "Team", "Completion (%)", "Days Tracked", "Streak", "Best Streak"]
+    st.dataframe(board, hide_index=True, use_container_width=True)
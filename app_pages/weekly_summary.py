@@ -0,0 +1,49 @@
+import datetime
+
+import streamlit as st
+
+import html_tables
+import profiling
+from app_pages import common
+
+
+@profiling.timed("page.weekly_summary")
+def render():
+    common.set_page_background_image("Weekly Summary")
+    st.title("Weekly Summary")
+    
+    today = datetime.date.today()
+    start_of_week = today - datetime.timedelta(days=today.weekday())
+    end_of_week = start_of_week + datetime.timedelta(days=6)
+
+    st.subheader(f"Summary for the week of {start_of_week.strftime('%b %d, %Y')} - {end_of_week.strftime('%b %d, %Y')}")
+
+    index = common.get_progress_index()
+    daily_breakdown_data = [
+        {"Day": date.strftime("%A"), "Completion %": f"{percentage:.0f}%"}
+        for date, percentage in index.completion_range(start_of_week, end_of_week)
+    ]
+
+    if not st.session_state.goals:
+        st.info("No goals set yet. Set goals to see your weekly summary!")
+        return
+
+    weekly_stats = index.week_summary(start_of_week)
+    avg_weekly_completion = weekly_stats["average"]
+    min_completion = weekly_stats["min"]
+    max_completion = weekly_stats["max"]
+
+    if not weekly_stats["days"]:
+        st.info("No goals were tracked this week. Start tracking your goals to see a summary!")
+        return
+    
+    st.write(common.get_motivational_message(avg_weekly_completion))
+
+    st.markdown("---")
+    st.subheader("Weekly Statistics:")
+    st.write(f"**Average Daily Completion:** {avg_weekly_completion:.0f}%")
+    st.write(f"**Highest Daily Completion:** {max_completion:.0f}%")
+    st.write(f"**Lowest Daily Completion:** {min_completion:.0f}%")
+
+    st.subheader("Daily Breakdown:")
+    st.markdown(html_tables.table_html(daily_breakdown_data), unsafe_allow_html=True)
@@ -0,0 +1,98 @@
+import base64
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+# --- Asset Configuration ---
+MIME_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.webp': 'image/webp'}
+DEFAULT_MAX_CACHE_BYTES = 32 * 1024 * 1024
+# Streamlit serves ./static at app/static when server.enableStaticServing is on.
+STATIC_DIR = "static"
+STATIC_URL_PREFIX = "app/static"
+BACKGROUNDS_SUBDIR = "backgrounds"
+
+BACKGROUND_CSS_TEMPLATE = """
+        <style>
+        .stApp {{
+            background-image: url("{url}");
+            background-size: cover;
+            background-position: center;
+            background-repeat: no-repeat;
+            background-attachment: fixed;
+        }}
+        </style>
+        """
+
+
+class AssetCache:
+    # Process-wide LRU of encoded assets, bounded by the total size of the cached strings.
+
+    def __init__(self, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = build()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                self._size += len(value)
+                # Always keep the newest entry, even if it alone exceeds the budget.
+                while self._size > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return value
+
+
+_CACHE = AssetCache()
+
+
+def mime_type_for(path):
+    return MIME_TYPES.get(os.path.splitext(path)[1].lower(), 'image/jpeg')
+
+
+def file_key(path):
+    # Keyed on mtime and size so replacing an image on disk is picked up without a restart.
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def encode_data_uri(path):
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    return f"data:{mime_type_for(path)};base64,{encoded}"
+
+
+def publish_static(path, static_dir=STATIC_DIR):
+    target_dir = os.path.join(static_dir, BACKGROUNDS_SUBDIR)
+    target = os.path.join(target_dir, os.path.basename(path))
+    source_stat = os.stat(path)
+    try:
+        target_stat = os.stat(target)
+        up_to_date = target_stat.st_size == source_stat.st_size and target_stat.st_mtime_ns >= source_stat.st_mtime_ns
+    except FileNotFoundError:
+        up_to_date = False
+    if not up_to_date:
+        os.makedirs(target_dir, exist_ok=True)
+        tmp_target = target + ".tmp"
+        shutil.copy2(path, tmp_target)
+        os.replace(tmp_target, target)
+    return f"{STATIC_URL_PREFIX}/{BACKGROUNDS_SUBDIR}/{os.path.basename(path)}"
+
+
+def background_css(path, use_static_url=False, cache=None):
+    cache = cache or _CACHE
+    key = ("background_css", use_static_url) + file_key(path)
+
+    def build():
+        url = publish_static(path) if use_static_url else encode_data_uri(path)
+        return BACKGROUND_CSS_TEMPLATE.format(url=url)
+
+    return cache.get_or_build(key, build)
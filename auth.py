@@ -0,0 +1,391 @@
+import argparse
+import base64
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+import journal
+import storage
+
+# --- Authentication Configuration ---
+DATA_DIR = "data"
+
+# Passwords live in each user's record as "password": an encoded hash. New hashes use
+# PBKDF2-SHA256 or scrypt from hashlib; bcrypt hashes ("$2b$...", as in older user_data.json
+# files) verify when the optional bcrypt package is installed and are upgraded on login.
+DEFAULT_SCHEME = "pbkdf2_sha256"
+DEFAULT_COSTS = {"pbkdf2_sha256": 600_000, "scrypt": 15}  # iterations / log2(N)
+SCRYPT_R, SCRYPT_P = 8, 1
+SALT_BYTES = 16
+# Hashing runs outside the GIL; at most this many logins hash at once, the rest wait.
+MAX_CONCURRENT_HASHES = os.cpu_count() or 1
+
+SECRET_FILE_NAME = "secret.key"
+SESSION_TTL_SECONDS = 12 * 3600
+
+# Failed attempts allowed per window before further attempts are refused outright.
+USER_MAX_FAILURES = 5
+IP_MAX_FAILURES = 20
+FAILURE_WINDOW_SECONDS = 15 * 60
+MAX_THROTTLE_KEYS = 100_000
+
+
+class AuthError(Exception):
+    pass
+
+
+class ThrottledError(AuthError):
+    def __init__(self, key_kind, retry_after):
+        super().__init__(f"Too many failed sign-in attempts for this {key_kind}; try again in {retry_after:.0f}s.")
+        self.key_kind = key_kind
+        self.retry_after = retry_after
+
+
+# --- Password hashing ---
+_HASH_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_HASHES)
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _derive(scheme, password, salt, cost):
+    with _HASH_SLOTS:
+        if scheme == "pbkdf2_sha256":
+            return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, cost)
+        if scheme == "scrypt":
+            n = 1 << cost
+            return hashlib.scrypt(
+                password.encode("utf-8"), salt=salt, n=n, r=SCRYPT_R, p=SCRYPT_P,
+                maxmem=256 * n * SCRYPT_R, dklen=32,
+            )
+    raise AuthError(f"Unknown password hash scheme '{scheme}'.")
+
+
+def hash_password(password, scheme=DEFAULT_SCHEME, cost=None):
+    # "<scheme>$<cost>$<salt>$<hash>", all base64 without padding.
+    cost = cost or DEFAULT_COSTS[scheme]
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{scheme}${cost}${_b64(salt)}${_b64(_derive(scheme, password, salt, cost))}"
+
+
+def _parse(encoded):
+    if encoded.startswith(("$2a$", "$2b$", "$2y$")):
+        return "bcrypt", int(encoded.split("$")[2]), None, None
+    scheme, cost, salt, digest = encoded.split("$")
+    return scheme, int(cost), _unb64(salt), _unb64(digest)
+
+
+def verify_password(password, encoded):
+    try:
+        scheme, cost, salt, digest = _parse(encoded)
+    except (AttributeError, ValueError, TypeError):
+        return False
+    if scheme == "bcrypt":
+        try:
+            import bcrypt
+        except ImportError:
+            raise AuthError("This account's password hash needs the optional 'bcrypt' package.") from None
+        with _HASH_SLOTS:
+            return bcrypt.checkpw(password.encode("utf-8"), encoded.encode("ascii"))
+    return hmac.compare_digest(_derive(scheme, password, salt, cost), digest)
+
+
+def needs_rehash(encoded, scheme=DEFAULT_SCHEME, cost=None):
+    try:
+        stored_scheme, stored_cost, _, _ = _parse(encoded)
+    except (AttributeError, ValueError, TypeError):
+        return True
+    return stored_scheme != scheme or stored_cost != (cost or DEFAULT_COSTS[scheme])
+
+
+# --- Session tokens ---
+def load_secret(data_dir):
+    # HABIT_TRACKER_SECRET_KEY wins; otherwise a random key is created once in the data dir so
+    # every app process (and the API server) signs and accepts the same tokens.
+    configured = os.environ.get("HABIT_TRACKER_SECRET_KEY")
+    if configured:
+        return configured.encode("utf-8")
+    path = os.path.join(data_dir, SECRET_FILE_NAME)
+    try:
+        with open(path, "rb") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+    os.makedirs(data_dir, exist_ok=True)
+    secret = secrets.token_hex(32).encode("ascii")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process won the race; use its key.
+        with open(path, "rb") as f:
+            return f.read().strip()
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+
+def credential_tag(encoded):
+    # Tokens carry this, so changing a password signs out that user's existing sessions.
+    return hashlib.sha256((encoded or "").encode("utf-8")).hexdigest()[:16]
+
+
+class SessionSigner:
+    # Stateless HMAC-SHA256 tokens: "<payload>.<signature>", payload = base64 JSON of the
+    # username, credential tag and expiry. Checking one costs a hash of a few bytes, not a
+    # password hash.
+
+    def __init__(self, secret, ttl=SESSION_TTL_SECONDS):
+        self.secret = secret
+        self.ttl = ttl
+
+    def _sign(self, payload):
+        return _b64(hmac.new(self.secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, username, tag, now=None):
+        claims = {"u": username, "t": tag, "exp": int((now or time.time()) + self.ttl)}
+        payload = _b64(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token, now=None):
+        # Returns (username, tag) for a valid, unexpired token, else None.
+        try:
+            payload, signature = token.split(".")
+            if not hmac.compare_digest(signature, self._sign(payload)):
+                return None
+            claims = json.loads(_unb64(payload))
+        except (AttributeError, ValueError, TypeError):
+            return None
+        if claims.get("exp", 0) < (now or time.time()):
+            return None
+        return claims.get("u"), claims.get("t")
+
+
+# --- Throttling ---
+class AttemptThrottle:
+    # Sliding window of failed attempts per key (a username or a client IP), process-wide
+    # and thread-safe. Checked before any password is hashed, so refused attempts cost nothing.
+
+    def __init__(self, max_failures, window=FAILURE_WINDOW_SECONDS, max_keys=MAX_THROTTLE_KEYS):
+        self.max_failures = max_failures
+        self.window = window
+        self.max_keys = max_keys
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, key, now=None):
+        # Seconds until `key` may try again; 0 when it is not throttled.
+        now = now or time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is None or len(failures) < self.max_failures:
+                return 0
+            return failures[len(failures) - self.max_failures] + self.window - now
+
+    def record_failure(self, key, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is None:
+                failures = self._failures[key] = deque(maxlen=self.max_failures)
+            failures.append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+# --- User registry ---
+class UserRegistry:
+    # Users and their password hashes, read from the app's store (a record with a "password"
+    # field can sign in). Shares the store's record cache, so token checks on every rerun and
+    # API request are a cached read plus one HMAC.
+
+    def __init__(self, store, secret, scheme=DEFAULT_SCHEME, cost=None, ttl=SESSION_TTL_SECONDS,
+                 user_max_failures=USER_MAX_FAILURES, ip_max_failures=IP_MAX_FAILURES):
+        if scheme not in DEFAULT_COSTS:
+            raise AuthError(f"Unknown password hash scheme '{scheme}'. Choose from: {', '.join(DEFAULT_COSTS)}")
+        self.store = store
+        self.scheme = scheme
+        self.cost = cost or DEFAULT_COSTS[scheme]
+        self.signer = SessionSigner(secret, ttl)
+        self.user_throttle = AttemptThrottle(user_max_failures)
+        self.ip_throttle = AttemptThrottle(ip_max_failures)
+        self._dummy_hash = None
+
+    def password_hash(self, username):
+        record = self.store.load_user(username)
+        return record.get("password") if record else None
+
+    def list_users(self):
+        return [username for username in self.store.list_users() if self.password_hash(username)]
+
+    def set_password_hash(self, username, encoded, only_if_missing=False):
+        # A versioned read-modify-write of just the "password" field.
+        for _ in range(storage.MAX_SAVE_ATTEMPTS):
+            record = self.store.load_user(username)
+            if only_if_missing and record and record.get("password"):
+                return False
+            updated = dict(record or storage.empty_user_record())
+            updated["password"] = encoded
+            try:
+                self.store.save_user(username, updated, expected_version=storage.record_version(record))
+            except storage.VersionConflict:
+                continue
+            return True
+        raise storage.StorageError(f"Could not update the password for '{username}'.")
+
+    def set_password(self, username, password):
+        self.set_password_hash(username.lower(), hash_password(password, self.scheme, self.cost))
+
+    def seed(self, password_hashes):
+        # Gives accounts a starting password hash; users who already have one keep it.
+        return sum(self.set_password_hash(u.lower(), h, only_if_missing=True) for u, h in password_hashes.items())
+
+    def authenticate(self, username, password, client_ip=None):
+        # The username on success, None for bad credentials; raises ThrottledError when the
+        # user or client has failed too often recently.
+        username = (username or "").strip().lower()
+        for throttle, key, kind in ((self.user_throttle, username, "account"), (self.ip_throttle, client_ip, "address")):
+            if key:
+                wait = throttle.retry_after(key)
+                if wait > 0:
+                    raise ThrottledError(kind, wait)
+        if self._dummy_hash is None:
+            # Made on the first attempt whoever it is for, so its cost reveals nothing either.
+            self._dummy_hash = hash_password(secrets.token_hex(8), self.scheme, self.cost)
+        encoded = self.password_hash(username) if username else None
+        # Unknown users are checked against a throwaway hash, so a miss takes as long as a bad password.
+        ok = verify_password(password or "", encoded or self._dummy_hash) and encoded is not None
+        if not ok:
+            if username:
+                self.user_throttle.record_failure(username)
+            if client_ip:
+                self.ip_throttle.record_failure(client_ip)
+            return None
+        self.user_throttle.reset(username)
+        if needs_rehash(encoded, self.scheme, self.cost):
+            try:
+                self.set_password(username, password)
+            except storage.StorageError:
+                pass  # still signed in; the upgrade is retried on the next login
+        return username
+
+    def issue_token(self, username):
+        return self.signer.issue(username, credential_tag(self.password_hash(username)))
+
+    def verify_token(self, token):
+        # The token's username if it is genuine, unexpired and issued for the current password.
+        verified = self.signer.verify(token)
+        if verified is None:
+            return None
+        username, tag = verified
+        encoded = self.password_hash(username) if username else None
+        if encoded is None or not hmac.compare_digest(tag or "", credential_tag(encoded)):
+            return None
+        return username
+
+
+# --- Command line ---
+
+def open_registry(args):
+    store = journal.get_journaled_storage(storage.get_storage(args.data_dir, args.storage))
+    return UserRegistry(store, load_secret(args.data_dir), args.scheme, args.cost)
+
+
+def read_password(args):
+    if args.password_stdin:
+        return sys.stdin.readline().rstrip("\n")
+    password = getpass.getpass("New password: ")
+    if password != getpass.getpass("Repeat password: "):
+        raise AuthError("Passwords do not match.")
+    return password
+
+
+def set_password_command(args):
+    password = read_password(args)
+    if not password:
+        raise AuthError("The password must not be empty.")
+    open_registry(args).set_password(args.username, password)
+    print(f"Password set for '{args.username.lower()}'.")
+
+
+def hash_command(args):
+    print(hash_password(read_password(args), args.scheme, args.cost))
+
+
+def list_command(args):
+    registry = open_registry(args)
+    for username in registry.list_users():
+        scheme = _parse(registry.password_hash(username))[0]
+        print(f"{username}\t{scheme}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Manage Habit Tracker sign-in credentials.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--storage",
+        choices=sorted(storage.BACKENDS),
+        default=os.environ.get("HABIT_TRACKER_STORAGE", storage.DEFAULT_BACKEND),
+    )
+    parser.add_argument(
+        "--scheme", choices=sorted(DEFAULT_COSTS),
+        default=os.environ.get("HABIT_TRACKER_PASSWORD_SCHEME", DEFAULT_SCHEME),
+    )
+    parser.add_argument(
+        "--cost", type=int, default=int(os.environ.get("HABIT_TRACKER_PASSWORD_COST", 0)) or None,
+        help="PBKDF2 iterations or log2 of the scrypt N parameter.",
+    )
+    parser.add_argument("--password-stdin", action="store_true", help="Read the password from stdin.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    set_parser = commands.add_parser("set-password", help="Create a user or change their password.")
+    set_parser.add_argument("username")
+    set_parser.set_defaults(handler=set_password_command)
+
+    hash_parser = commands.add_parser("hash", help="Print the hash of a password (e.g. for seeding).")
+    hash_parser.set_defaults(handler=hash_command)
+
+    list_parser = commands.add_parser("list", help="List users who can sign in.")
+    list_parser.set_defaults(handler=list_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except (AuthError, storage.StorageError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import argparse
+import datetime
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import auth  # noqa: E402
+import journal  # noqa: E402
+import storage  # noqa: E402
+from benchmarks import synthetic_data  # noqa: E402
+
+# --- JSON API load test ---
+# Starts api_server.py in its own process on a throwaway data directory, then has one
+# keep-alive client thread per user push check-ins for a fixed time:
+#   single - PUT /progress/<date>, one day (every goal) per request
+#   batch  - POST /progress, --batch-days days per request
+# Afterwards the server is stopped (flushing its queue) and the stored records are checked
+# against what the clients sent.
+PASSWORD = "bench-password"
+PASSWORD_COST = 1000  # cheap sign-ins; hashing is not what is measured here
+
+
+def prepare_data_dir(data_dir, users, goals, backend_name):
+    store = journal.get_journaled_storage(storage.get_storage(data_dir, backend_name))
+    encoded = auth.hash_password(PASSWORD, auth.DEFAULT_SCHEME, PASSWORD_COST)
+    names = synthetic_data.goal_names(goals)
+    usernames = [f"user{i:04d}" for i in range(users)]
+    for username in usernames:
+        store.save_user(username, {"goals": names, "daily_progress": {}, "password": encoded})
+    return usernames, names
+
+
+def start_server(data_dir, backend_name, workers, flush_seconds):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "api_server.py"), "--data-dir", data_dir, "--storage", backend_name,
+         "--port", "0", "--workers", str(workers), "--flush-seconds", str(flush_seconds)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True,
+        env={**os.environ, "HABIT_TRACKER_PASSWORD_COST": str(PASSWORD_COST)},
+    )
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError("The API server did not start.")
+    port = int(line.split("http://", 1)[1].split("/", 1)[0].rsplit(":", 1)[1])
+    return process, port
+
+
+def request(conn, method, path, body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {path} -> {response.status}: {payload}")
+    return payload
+
+
+def run_client(port, username, goals, mode, batch_days, seconds, start_date, result):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    token = request(conn, "POST", "/api/v1/session", {"username": username, "password": PASSWORD})["token"]
+    latencies, events, offset = [], 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        days = [(start_date + datetime.timedelta(days=offset + i)).isoformat() for i in range(batch_days if mode == "batch" else 1)]
+        offset += len(days)
+        started = time.perf_counter()
+        if mode == "batch":
+            request(conn, "POST", "/api/v1/progress", {"days": {d: {g: True for g in goals} for d in days}}, token)
+        else:
+            request(conn, "PUT", f"/api/v1/progress/{days[0]}", {g: True for g in goals}, token)
+        latencies.append(time.perf_counter() - started)
+        events += len(days) * len(goals)
+    result.update(username=username, latencies=latencies, events=events, days=offset)
+    conn.close()
+
+
+def run_mode(args, mode, work_dir):
+    data_dir = os.path.join(work_dir, mode)
+    usernames, goals = prepare_data_dir(data_dir, args.users, args.goals, args.storage)
+    process, port = start_server(data_dir, args.storage, args.workers, args.flush_seconds)
+    try:
+        results = [{} for _ in usernames]
+        start_date = datetime.date(2000, 1, 1)
+        threads = [
+            threading.Thread(target=run_client, args=(port, u, goals, mode, args.batch_days, args.seconds, start_date, r))
+            for u, r in zip(usernames, results)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()  # the server flushes its queue before exiting
+        process.wait(timeout=60)
+
+    store = journal.get_journaled_storage(storage.get_storage(data_dir, args.storage))
+    missing = sum(r["days"] - len(store.load_user(r["username"])["daily_progress"]) for r in results if r)
+    latencies = sorted(latency for r in results if r for latency in r["latencies"])
+    if not latencies:
+        raise RuntimeError("No requests completed.")
+    return {
+        "requests": len(latencies),
+        "events": sum(r["events"] for r in results if r),
+        "requests_per_second": len(latencies) / elapsed,
+        "check_ins_per_second": sum(r["events"] for r in results if r) / elapsed,
+        "latency_ms": {
+            "median": statistics.median(latencies) * 1000,
+            "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000 if len(latencies) >= 100 else latencies[-1] * 1000,
+        },
+        "days_missing_after_flush": missing,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Habit Tracker JSON API.")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent clients, one user each.")
+    parser.add_argument("--goals", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=5.0, help="How long each mode runs.")
+    parser.add_argument("--batch-days", type=int, default=30)
+    parser.add_argument("--modes", nargs="+", choices=["single", "batch"], default=["single", "batch"])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--flush-seconds", type=float, default=1.0)
+    parser.add_argument("--storage", choices=sorted(storage.BACKENDS), default=storage.DEFAULT_BACKEND)
+    parser.add_argument("--output", help="Also write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    report = {"users": args.users, "goals": args.goals, "storage": args.storage, "modes": {}}
+    with tempfile.TemporaryDirectory(prefix="habit-api-") as work_dir:
+        for mode in args.modes:
+            report["modes"][mode] = run_mode(args, mode, work_dir)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import analytics  # noqa: E402
+import calendar_views  # noqa: E402
+import journal  # noqa: E402
+import progress_index  # noqa: E402
+import quotes  # noqa: E402
+import record_cache  # noqa: E402
+import storage  # noqa: E402
+from benchmarks import synthetic_data  # noqa: E402
+
+# --- Benchmark harness for the data and analytics paths ---
+# Runs headless (no Streamlit) and prints machine-readable JSON, so runs on different
+# commits can be diffed.
+
+
+def legacy_calculate_daily_completion(goals, daily_progress, date_str):
+    # The original per-date dict comprehension from habit_tracker_app.py, kept as a baseline.
+    if date_str not in daily_progress:
+        return 0.0
+    tracked = {goal: status for goal, status in daily_progress[date_str].items() if goal in goals}
+    if not tracked:
+        return 0.0
+    return (sum(1 for status in tracked.values() if status) / len(tracked)) * 100
+
+
+def legacy_report_pages(goals, daily_progress, today):
+    # Home's 7-day average, the Progress Reports table and the Weekly Summary, as originally computed.
+    dates = [(today - datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    recent = [
+        legacy_calculate_daily_completion(goals, daily_progress, d) for d in dates
+        if d in daily_progress and any(g in goals for g in daily_progress[d])
+    ]
+    report = [legacy_calculate_daily_completion(goals, daily_progress, d) for d in dates]
+    start_of_week = today - datetime.timedelta(days=today.weekday())
+    week = [
+        legacy_calculate_daily_completion(goals, daily_progress, (start_of_week + datetime.timedelta(days=i)).strftime("%Y-%m-%d"))
+        for i in range(7)
+    ]
+    return recent, report, week
+
+
+def index_report_pages(index, today):
+    start_of_week = today - datetime.timedelta(days=today.weekday())
+    return (
+        index.recent_average(7, today),
+        index.completion_range(today - datetime.timedelta(days=6), today),
+        index.week_summary(start_of_week),
+    )
+
+
+def year_view_page(matrix, today):
+    # What the Calendar & Trends page computes for a full year.
+    start, end = datetime.date(today.year, 1, 1), datetime.date(today.year, 12, 31)
+    days = matrix.aggregate(start, end, "day")
+    completion = {day.date(): value for day, value in days["completion"].items()}
+    tracked = {day.date(): bool(count) for day, count in days["tracked_days"].items()}
+    return (
+        calendar_views.year_heatmap_html(completion, tracked, start, end),
+        matrix.aggregate(start, end, "year"),
+        matrix.aggregate(start, end, "week", per_goal=True),
+    )
+
+
+class Bench:
+    def __init__(self, repeat, measure_memory=True):
+        self.repeat = repeat
+        self.measure_memory = measure_memory
+        self.results = []
+
+    def run(self, name, func, ops=1, repeat=None, **extra):
+        timings = []
+        for _ in range(repeat or self.repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        peak = None
+        if self.measure_memory:
+            # A separate traced pass: tracemalloc slows allocation-heavy code several-fold.
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        result = {
+            "name": name,
+            "ops": ops,
+            "seconds": {
+                "min": min(timings),
+                "median": statistics.median(timings),
+                "mean": statistics.fmean(timings),
+            },
+            "seconds_per_op": min(timings) / ops,
+            "peak_bytes": peak,
+            **extra,
+        }
+        self.results.append(result)
+        peak_text = f"  peak {peak / 1e6:8.2f} MB" if peak is not None else ""
+        print(f"{name:<40} {result['seconds_per_op'] * 1000:10.3f} ms/op{peak_text}", file=sys.stderr)
+        return result
+
+
+def directory_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+        if name != storage.LEGACY_FILE_NAME + storage.MIGRATED_SUFFIX
+    )
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args, work_dir):
+    bench = Bench(args.repeat, measure_memory=not args.no_memory)
+    legacy_path = os.path.join(work_dir, "source", storage.LEGACY_FILE_NAME)
+    started = time.perf_counter()
+    synthetic_data.write_user_data(legacy_path, args.users, args.goals, args.days, args.seed)
+    generate_seconds = time.perf_counter() - started
+
+    # Whole-file persistence, as load_all_user_data/save_all_user_data worked originally.
+    def legacy_load():
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    all_data = legacy_load()
+    bench.run("legacy.load_all_user_data", legacy_load)
+    legacy_copy = os.path.join(work_dir, "legacy_copy.json")
+
+    def legacy_save(all_data=all_data):
+        with open(legacy_copy, "w", encoding="utf-8") as f:
+            json.dump(all_data, f, indent=4)
+
+    bench.run("legacy.save_all_user_data", legacy_save)
+
+    rng = random.Random(args.seed)
+    sample = rng.sample(sorted(all_data), min(args.sample_users, len(all_data)))
+    today = datetime.date.today()
+    today_str = today.strftime("%Y-%m-%d")
+    del all_data, legacy_save  # the whole dataset is not kept for the per-user benchmarks
+
+    # Per-user stores.
+    for backend_name in args.backends:
+        backends = []
+
+        def migrate():
+            # Each pass (timed or traced) migrates into a fresh directory.
+            data_dir = os.path.join(work_dir, f"{backend_name}-{len(backends)}")
+            os.makedirs(data_dir)
+            shutil.copy(legacy_path, os.path.join(data_dir, storage.LEGACY_FILE_NAME))
+            backends.append(storage.BACKENDS[backend_name](data_dir))
+            storage.migrate_legacy_file(backends[-1])
+
+        migrated = bench.run(f"{backend_name}.migrate", migrate, repeat=1)
+        migrated["store_bytes"] = directory_bytes(backends[0].data_dir)
+        store = journal.JournaledStorage(backends[0])
+        cached = record_cache.CachedStorage(store, revalidate_after=60)
+        records = {username: store.load_user(username) for username in sample}
+
+        # A fresh process logging in: open the store, read one user.
+        bench.run(
+            f"{backend_name}.cold_login",
+            lambda: storage.BACKENDS[backend_name](backends[0].data_dir).load_user(sample[0]),
+        )
+        bench.run(f"{backend_name}.load_user", lambda: [store.load_user(u) for u in sample], ops=len(sample))
+        bench.run(f"{backend_name}.save_user", lambda: [store.save_user(u, records[u]) for u in sample], ops=len(sample))
+        bench.run(
+            f"{backend_name}.append_progress",
+            lambda: [
+                store.append_progress(u, [journal.make_progress_event(today_str, g, True) for g in records[u]["goals"]])
+                for u in sample
+            ],
+            ops=len(sample),
+        )
+        store.compact_all()
+        [cached.load_user(u) for u in sample]
+        bench.run(f"{backend_name}.cached_load_user", lambda: [cached.load_user(u) for u in sample], ops=len(sample))
+
+    # Report computations over the sampled users.
+    records = list(records.values())
+    bench.run(
+        "pages.legacy_calculate_daily_completion",
+        lambda: [legacy_report_pages(r["goals"], r["daily_progress"], today) for r in records],
+        ops=len(records),
+    )
+    indexes = []
+    bench.run(
+        "pages.progress_index_build",
+        lambda: indexes.append([progress_index.ProgressIndex(r["goals"], r["daily_progress"]) for r in records]),
+        ops=len(records), repeat=1,
+    )
+    bench.run("pages.progress_index_lookups", lambda: [index_report_pages(i, today) for i in indexes[0]], ops=len(records))
+    matrices = []
+    bench.run(
+        "pages.progress_matrix_build",
+        lambda: matrices.append([analytics.ProgressMatrix.from_progress(r["goals"], r["daily_progress"]) for r in records]),
+        ops=len(records), repeat=1,
+    )
+    # The first pass builds each matrix's prefix sums; later ones reuse cached aggregates.
+    bench.run("pages.year_view_first", lambda: [year_view_page(m, today) for m in matrices[0]], ops=len(records), repeat=1)
+    bench.run("pages.year_view", lambda: [year_view_page(m, today) for m in matrices[0]], ops=len(records))
+
+    # Quote of the day over a large quotes file: reading every line per pick (as load_quotes did)
+    # against the offset index, built once per file version and then opened from its sidecar.
+    quotes_path = synthetic_data.write_quotes(os.path.join(work_dir, "quotes", "quotes.txt"), args.quotes, args.seed)
+
+    def legacy_quote():
+        with open(quotes_path, "r", encoding="utf-8") as f:
+            return rng.choice([line.strip() for line in f if line.strip()])
+
+    def build_quote_index():
+        with open(quotes_path, "rb") as f:
+            return quotes.build_index(f)
+
+    bench.run("quotes.legacy_load_and_pick", legacy_quote)
+    bench.run("quotes.build_index", build_quote_index, quotes=args.quotes)
+    book = quotes.QuoteBook(quotes_path)
+    book.daily_quote()
+    bench.run("quotes.open_indexed", lambda: quotes.QuoteBook(quotes_path).daily_quote())
+    users = [f"user{i:06d}" for i in range(1000)]
+    bench.run("quotes.daily_quote", lambda: [book.daily_quote(today, u) for u in users], ops=len(users))
+    bench.run("quotes.daily_quote_tagged", lambda: [book.daily_quote(today, u, "focus") for u in users], ops=len(users))
+    book.close()
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "users": args.users,
+            "goals": args.goals,
+            "days": args.days,
+            "sample_users": len(sample),
+            "quotes": args.quotes,
+            "repeat": args.repeat,
+            "dataset_bytes": os.path.getsize(legacy_path),
+            "generate_seconds": generate_seconds,
+        },
+        "results": bench.results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Habit Tracker persistence and report computations.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--goals", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-users", type=int, default=50, help="Users exercised by the per-user benchmarks.")
+    parser.add_argument("--quotes", type=int, default=300_000, help="Lines in the generated quotes file.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass for peak memory.")
+    parser.add_argument("--backends", nargs="+", choices=sorted(storage.BACKENDS), default=["shards", "sqlite", "history"])
+    parser.add_argument("--work-dir", help="Keep generated data here instead of a temporary directory.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        results = run_benchmarks(args, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="habit-bench-") as work_dir:
+            results = run_benchmarks(args, work_dir)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
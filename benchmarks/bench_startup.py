@@ -0,0 +1,140 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic_data  # noqa: E402
+
+# --- Startup benchmark ---
+# Every sample runs in a fresh interpreter, so imports are paid again as on a cold server
+# start. Two measurements:
+#   imports  - what opening each page imports (streamlit excluded), and whether pandas/numpy load
+#   sessions - a scripted session through Login, Home and Goal Tracking with AppTest: the first
+#              run of each page, then warm reruns of Goal Tracking
+# The session user starts with a year of synthetic history (Goal Tracking needs goals).
+# --app-dir points the session measurement at another checkout (e.g. an older revision).
+IMPORT_PAGES = ("login", "home", "goal_tracking", "progress_reports", "weekly_summary", "calendar_trends", "team")
+
+IMPORT_PROBE = """
+import json, sys, time
+import streamlit
+started = time.perf_counter()
+import app_pages
+app_pages.load_page(sys.argv[1])
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "pandas": "pandas" in sys.modules,
+    "numpy": "numpy" in sys.modules,
+}))
+"""
+
+SESSION_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+result = {"Login": timed(at.run)}
+at.text_input(key="login_username").input(sys.argv[2])
+at.text_input(key="login_password").input(sys.argv[3])
+result["Home"] = timed(at.button[0].click().run)
+result["Goal Tracking"] = timed(at.selectbox[0].select("Goal Tracking").run)
+result["Goal Tracking rerun"] = min(timed(at.run) for _ in range(int(sys.argv[4])))
+result["errors"] = [e.value for e in at.exception]
+result["pandas"] = "pandas" in sys.modules
+print(json.dumps(result))
+"""
+
+
+def prepare_app_dir(app_dir, work_dir, username, days):
+    # A throwaway copy with only the session user's data, migrated from user_data.json on first use.
+    target = os.path.join(work_dir, "app")
+    shutil.copytree(
+        app_dir, target,
+        ignore=shutil.ignore_patterns(".git", "__pycache__", "data", "requests.jsonl", "benchmarks"),
+    )
+    os.makedirs(os.path.join(target, "data"))
+    quotes = os.path.join(app_dir, "data", "quotes.txt")
+    if os.path.exists(quotes):
+        shutil.copy(quotes, os.path.join(target, "data"))
+    rng = random.Random(0)
+    record = synthetic_data.make_user_record(rng, synthetic_data.goal_names(5), days, datetime.date.today())
+    with open(os.path.join(target, "data", "user_data.json"), "w", encoding="utf-8") as f:
+        json.dump({username: record}, f)
+    return target
+
+
+def run_probe(code, cwd, *args):
+    completed = subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=cwd, capture_output=True, text=True, check=True,
+        env={**os.environ, "HABIT_TRACKER_FLUSH_SECONDS": "0", "PYTHONPATH": cwd},
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples, key):
+    values = [sample[key] for sample in samples]
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def run_benchmarks(args, work_dir):
+    app_dir = prepare_app_dir(args.app_dir, work_dir, args.username, args.days)
+    report = {"app_dir": os.path.abspath(args.app_dir), "repeat": args.repeat}
+    if os.path.isdir(os.path.join(app_dir, "app_pages")):
+        report["imports"] = {}
+        for page in IMPORT_PAGES:
+            samples = [run_probe(IMPORT_PROBE, app_dir, page) for _ in range(args.repeat)]
+            report["imports"][page] = {
+                "seconds": summarize(samples, "seconds"),
+                "pandas": samples[0]["pandas"],
+                "numpy": samples[0]["numpy"],
+            }
+    samples = [
+        run_probe(SESSION_PROBE, app_dir, os.path.join(app_dir, "habit_tracker_app.py"),
+                  args.username, args.password, str(args.reruns))
+        for _ in range(args.repeat)
+    ]
+    report["sessions"] = {
+        step: summarize(samples, step) for step in ("Login", "Home", "Goal Tracking", "Goal Tracking rerun")
+    }
+    report["sessions"]["pandas_loaded"] = samples[0]["pandas"]
+    report["sessions"]["errors"] = samples[0]["errors"]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Habit Tracker cold start and page imports.")
+    parser.add_argument("--app-dir", default=ROOT)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement.")
+    parser.add_argument("--reruns", type=int, default=5, help="Warm reruns per session (the fastest is kept).")
+    parser.add_argument("--username", default="mohit")
+    parser.add_argument("--password", default="12345")
+    parser.add_argument("--days", type=int, default=365, help="Days of history for the session user.")
+    parser.add_argument("--output", help="Also write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="habit-startup-") as work_dir:
+        report = run_benchmarks(args, work_dir)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
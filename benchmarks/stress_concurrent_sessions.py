@@ -0,0 +1,184 @@
+import argparse
+import copy
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import journal  # noqa: E402
+import record_cache  # noqa: E402
+import storage  # noqa: E402
+
+# --- Concurrent session stress test ---
+# Simulates many browser sessions (threads) and several app processes editing the same
+# users at once. Every write is unique to its worker, so after the run each one must be
+# present in the store; anything missing is a lost update.
+START_DATE = datetime.date(2024, 1, 1)
+
+
+def open_store(data_dir, backend_name):
+    # Fresh objects per process, as separate Streamlit servers would have.
+    return record_cache.CachedStorage(journal.JournaledStorage(storage.BACKENDS[backend_name](data_dir)))
+
+
+def run_worker(store, worker_id, users, ops, seed):
+    # Returns the writes this worker expects to survive and its save latencies.
+    rng = random.Random(seed)
+    expected_goals, expected_cells, latencies, conflicts = [], [], [], 0
+    for op in range(ops):
+        username = rng.choice(users)
+        kind = rng.random()
+        started = time.perf_counter()
+        if kind < 0.2:
+            # Goal Setting: add a goal unique to this worker.
+            goal = f"w{worker_id}-goal{op}"
+            base = store.load_user(username)
+            mine = copy.deepcopy(base)
+            mine["goals"].append(goal)
+            _, merge_conflicts = storage.save_merged(store, username, base, mine)
+            expected_goals.append((username, goal))
+        elif kind < 0.6:
+            # A whole-record save touching one cell only this worker writes.
+            date_str = (START_DATE + datetime.timedelta(days=op)).isoformat()
+            goal = f"w{worker_id}"
+            base = store.load_user(username)
+            mine = copy.deepcopy(base)
+            mine["daily_progress"].setdefault(date_str, {})[goal] = True
+            _, merge_conflicts = storage.save_merged(store, username, base, mine)
+            expected_cells.append((username, date_str, goal))
+        else:
+            # Goal Tracking: journal append.
+            date_str = (START_DATE + datetime.timedelta(days=op)).isoformat()
+            goal = f"w{worker_id}-tracked"
+            store.append_progress(username, [journal.make_progress_event(date_str, goal, True)])
+            merge_conflicts = 0
+            expected_cells.append((username, date_str, goal))
+        latencies.append(time.perf_counter() - started)
+        conflicts += merge_conflicts
+    return {"goals": expected_goals, "cells": expected_cells, "latencies": latencies, "conflicts": conflicts}
+
+
+def run_process(data_dir, backend_name, first_worker, threads, users, ops, seed, queue):
+    store = open_store(data_dir, backend_name)
+    results = run_threads(store, first_worker, threads, users, ops, seed)
+    queue.put(results)
+
+
+def run_threads(store, first_worker, threads, users, ops, seed):
+    results = [None] * threads
+    errors = []
+
+    def target(i):
+        try:
+            results[i] = run_worker(store, first_worker + i, users, ops, seed + first_worker + i)
+        except Exception as e:  # reported, not raised, so one failure does not hang the run
+            errors.append(f"worker {first_worker + i}: {e!r}")
+
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return {"results": [r for r in results if r is not None], "errors": errors}
+
+
+def verify(store, results):
+    lost = []
+    records = {}
+    for result in results:
+        for username, goal in result["goals"]:
+            record = records.setdefault(username, store.load_user(username))
+            if goal not in record["goals"]:
+                lost.append(f"{username}: goal {goal}")
+        for username, date_str, goal in result["cells"]:
+            record = records.setdefault(username, store.load_user(username))
+            if record["daily_progress"].get(date_str, {}).get(goal) is not True:
+                lost.append(f"{username}: {date_str}/{goal}")
+    return lost
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_stress(args, data_dir):
+    users = [f"user{i:03d}" for i in range(args.users)]
+    setup = storage.BACKENDS[args.backend](data_dir)
+    for username in users:
+        setup.save_user(username, storage.empty_user_record())
+
+    started = time.perf_counter()
+    queue = multiprocessing.get_context("spawn").Queue()
+    processes = [
+        multiprocessing.get_context("spawn").Process(
+            target=run_process,
+            args=(data_dir, args.backend, (p + 1) * args.threads, args.threads, users, args.ops, args.seed, queue),
+        )
+        for p in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [run_threads(open_store(data_dir, args.backend), 0, args.threads, users, args.ops, args.seed)]
+    outcomes += [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    results = [result for outcome in outcomes for result in outcome["results"]]
+    errors = [error for outcome in outcomes for error in outcome["errors"]]
+    lost = verify(open_store(data_dir, args.backend), results)
+    latencies = [seconds for result in results for seconds in result["latencies"]]
+    return {
+        "backend": args.backend,
+        "users": args.users,
+        "workers": args.threads * (args.processes + 1),
+        "processes": args.processes + 1,
+        "operations": len(latencies),
+        "elapsed_seconds": elapsed,
+        "merge_conflicts": sum(result["conflicts"] for result in results),
+        "lost_updates": len(lost),
+        "lost_examples": lost[:10],
+        "errors": errors,
+        "latency_seconds": {
+            "p50": percentile(latencies, 0.5) if latencies else None,
+            "p95": percentile(latencies, 0.95) if latencies else None,
+            "p99": percentile(latencies, 0.99) if latencies else None,
+            "max": max(latencies) if latencies else None,
+            "mean": statistics.fmean(latencies) if latencies else None,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress concurrent saves and check that no update is lost.")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.DEFAULT_BACKEND)
+    parser.add_argument("--users", type=int, default=5, help="Few users means heavy contention.")
+    parser.add_argument("--threads", type=int, default=8, help="Sessions per process.")
+    parser.add_argument("--processes", type=int, default=2, help="Extra app processes besides this one.")
+    parser.add_argument("--ops", type=int, default=50, help="Operations per session.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="Keep the data here instead of a temporary directory.")
+    args = parser.parse_args(argv)
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        report = run_stress(args, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="habit-stress-") as work_dir:
+            report = run_stress(args, work_dir)
+    print(json.dumps(report, indent=2))
+    return 1 if report["lost_updates"] or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import argparse
+import datetime
+import json
+import os
+import random
+
+# --- Synthetic user_data.json generator ---
+# Users are written one at a time, so datasets far larger than memory can be produced.
+GOAL_NAMES = [
+    "Drink 8 glasses of water", "Exercise for 30 minutes", "Read for 15 minutes",
+    "Meditate for 10 minutes", "Journal for 5 minutes", "Take a 15-minute walk",
+    "Learn a new skill", "Practice gratitude", "Go to bed before 11 PM", "Wake up before 7 AM",
+]
+
+
+def goal_names(count):
+    names = GOAL_NAMES[:count]
+    names += [f"Custom goal {i}" for i in range(len(names), count)]
+    return names
+
+
+def make_user_record(rng, goals, days, end_date, track_rate=0.8, complete_rate=0.6):
+    user_goals = rng.sample(goals, rng.randint(max(1, len(goals) // 2), len(goals)))
+    daily_progress = {}
+    for offset in range(days):
+        if rng.random() > track_rate:
+            continue
+        date_str = (end_date - datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+        daily_progress[date_str] = {goal: rng.random() < complete_rate for goal in user_goals}
+    return {"goals": user_goals, "daily_progress": daily_progress}
+
+
+def iter_users(users, goals, days, seed=0, end_date=None):
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date.today()
+    goals = goal_names(goals)
+    for i in range(users):
+        yield f"user{i:06d}", make_user_record(rng, goals, days, end_date)
+
+
+def write_user_data(path, users, goals, days, seed=0, layout="dict"):
+    # layout "dict" is what the app writes ({"<username>": {...}}); "users" is the {"users": [...]} form.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{" if layout == "dict" else '{"users": [')
+        for i, (username, record) in enumerate(iter_users(users, goals, days, seed)):
+            if i:
+                f.write(",")
+            if layout == "dict":
+                f.write(f"{json.dumps(username)}: {json.dumps(record)}")
+            else:
+                f.write(json.dumps({"username": username, **record}))
+        f.write("}" if layout == "dict" else "]}")
+    return path
+
+
+QUOTE_TAGS = ["habits", "focus", "health", "mindset", "motivation", "success"]
+
+
+def write_quotes(path, count, seed=0, tag_rate=0.5):
+    # A quotes.txt in the app's format; about `tag_rate` of the lines carry one or two tags.
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            tags = rng.sample(QUOTE_TAGS, rng.randint(1, 2)) if rng.random() < tag_rate else []
+            prefix = f"[{', '.join(tags)}] " if tags else ""
+            f.write(f"{prefix}Small step number {i}, taken again tomorrow, becomes a habit. - Author {i % 997}\n")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic user_data.json.")
+    parser.add_argument("output")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--goals", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--layout", choices=("dict", "users"), default="dict")
+    args = parser.parse_args(argv)
+    write_user_data(args.output, args.users, args.goals, args.days, args.seed, args.layout)
+    print(f"Wrote {args.users} users x {args.goals} goals x {args.days} days to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
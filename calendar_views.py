@@ -0,0 +1,100 @@
+import calendar
+import datetime
+import html
+
+# --- Calendar Heatmap Configuration ---
+# Untracked days, then four completion bands (GitHub's contribution palette).
+LEVEL_COLORS = ("#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39")
+CELL_PX = 12
+GAP_PX = 3
+
+
+def completion_level(percentage, tracked):
+    if not tracked:
+        return 0
+    return min(4, 1 + int(percentage // 25))
+
+
+def _cell(day, percentage, tracked, size=CELL_PX):
+    label = f"{day.isoformat()}: {percentage:.0f}%" if tracked else f"{day.isoformat()}: not tracked"
+    color = LEVEL_COLORS[completion_level(percentage, tracked)]
+    return (
+        f'<div title="{label}" style="width:{size}px;height:{size}px;border-radius:2px;'
+        f'background:{color};"></div>'
+    )
+
+
+def legend_html():
+    swatches = "".join(
+        f'<span style="display:inline-block;width:{CELL_PX}px;height:{CELL_PX}px;border-radius:2px;'
+        f'background:{color};margin:0 1px;vertical-align:middle;"></span>'
+        for color in LEVEL_COLORS
+    )
+    return f'<div style="font-size:11px;margin-top:4px;">Not tracked / less {swatches} more</div>'
+
+
+def year_heatmap_html(completion, tracked, start, end):
+    # One column per Monday-based week and one row per weekday, like GitHub's contribution
+    # graph. `completion` and `tracked` map each date to its percentage and tracked flag.
+    first = start - datetime.timedelta(days=start.weekday())
+    weeks = (end - first).days // 7 + 1
+    columns, month_labels, previous_month = [], [], None
+    for week in range(weeks):
+        week_start = first + datetime.timedelta(weeks=week)
+        cells = []
+        for weekday in range(7):
+            day = week_start + datetime.timedelta(days=weekday)
+            if start <= day <= end:
+                cells.append(_cell(day, completion.get(day, 0.0), tracked.get(day, False)))
+            else:
+                cells.append(f'<div style="width:{CELL_PX}px;height:{CELL_PX}px;"></div>')
+        columns.append(f'<div style="display:grid;grid-template-rows:repeat(7,{CELL_PX}px);gap:{GAP_PX}px;">{"".join(cells)}</div>')
+        month = max(week_start, start).month
+        month_labels.append(calendar.month_abbr[month] if month != previous_month else "")
+        previous_month = month
+    label_row = "".join(
+        f'<div style="width:{CELL_PX}px;font-size:10px;overflow:visible;white-space:nowrap;">{label}</div>'
+        for label in month_labels
+    )
+    weekday_labels = "".join(
+        f'<div style="height:{CELL_PX}px;font-size:10px;line-height:{CELL_PX}px;">'
+        f'{calendar.day_abbr[weekday] if weekday % 2 == 0 else ""}</div>'
+        for weekday in range(7)
+    )
+    return (
+        '<div style="overflow-x:auto;">'
+        f'<div style="display:flex;gap:{GAP_PX}px;margin-left:{CELL_PX * 3}px;">{label_row}</div>'
+        f'<div style="display:flex;gap:{GAP_PX}px;">'
+        f'<div style="display:grid;grid-template-rows:repeat(7,{CELL_PX}px);gap:{GAP_PX}px;width:{CELL_PX * 3 - GAP_PX}px;">{weekday_labels}</div>'
+        f'{"".join(columns)}</div>'
+        f'{legend_html()}</div>'
+    )
+
+
+def month_calendar_html(completion, tracked, year, month):
+    # A month grid from calendar.Calendar, each day shaded by its completion.
+    header = "".join(
+        f'<th style="padding:4px;font-weight:normal;">{calendar.day_abbr[weekday]}</th>' for weekday in range(7)
+    )
+    rows = []
+    for week in calendar.Calendar(firstweekday=0).monthdatescalendar(year, month):
+        cells = []
+        for day in week:
+            if day.month != month:
+                cells.append("<td></td>")
+                continue
+            is_tracked = tracked.get(day, False)
+            percentage = completion.get(day, 0.0)
+            color = LEVEL_COLORS[completion_level(percentage, is_tracked)]
+            text_color = "#ffffff" if completion_level(percentage, is_tracked) >= 3 else "#24292f"
+            detail = f"{percentage:.0f}%" if is_tracked else "&nbsp;"
+            cells.append(
+                f'<td title="{html.escape(day.isoformat())}" style="background:{color};color:{text_color};'
+                f'border-radius:4px;padding:6px;text-align:center;width:14%;">'
+                f'<div style="font-weight:bold;">{day.day}</div><div style="font-size:11px;">{detail}</div></td>'
+            )
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+    return (
+        '<table style="border-collapse:separate;border-spacing:3px;width:100%;">'
+        f"<thead><tr>{header}</tr></thead><tbody>{''.join(rows)}</tbody></table>{legend_html()}"
+    )
@@ -0,0 +1,299 @@
+import base64
+import datetime
+import functools
+import zlib
+from collections.abc import Mapping, MutableMapping
+
+# --- Compact daily_progress encoding ---
+# A user's history as bit planes over one date range: plane 0 marks the days that have an
+# entry, and every goal gets a "tracked" and a "done" plane. Goal names are stored once.
+# CompactProgress exposes the same {date: {goal: bool}} API the app has always used.
+ENCODING = "bitset-v1"
+MIN_STRIDE = 8  # bytes per plane, i.e. 64 days
+
+
+@functools.lru_cache(maxsize=8192)
+def date_key(ordinal):
+    return datetime.date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+def to_ordinal(date_str):
+    return datetime.date.fromisoformat(date_str).toordinal()
+
+
+def is_encoded(value):
+    return isinstance(value, Mapping) and value.get("encoding") == ENCODING
+
+
+class DayStatuses(MutableMapping):
+    # Live view of one day: reads and writes go straight to the owning CompactProgress.
+
+    __slots__ = ("_progress", "_ordinal")
+
+    def __init__(self, progress, ordinal):
+        self._progress = progress
+        self._ordinal = ordinal
+
+    def __getitem__(self, goal):
+        status = self._progress._status(self._ordinal, goal)
+        if status is None:
+            raise KeyError(goal)
+        return status
+
+    def __setitem__(self, goal, status):
+        self._progress._set_status(self._ordinal, goal, status)
+
+    def __delitem__(self, goal):
+        if not self._progress._clear_status(self._ordinal, goal):
+            raise KeyError(goal)
+
+    def __iter__(self):
+        return self._progress._iter_goals(self._ordinal)
+
+    def __len__(self):
+        return len(self._progress._day_items(self._ordinal))
+
+    def items(self):
+        # A snapshot list rather than a live view: one pass over the bit planes.
+        return self._progress._day_items(self._ordinal)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __deepcopy__(self, memo):
+        return dict(self)
+
+
+class CompactProgress(MutableMapping):
+
+    def __init__(self, daily_progress=None):
+        self._goals = []
+        self._goal_ids = {}
+        self._start = 0      # ordinal of bit 0; a multiple of 8, so ranges extend by whole bytes
+        self._stride = 0     # bytes per plane
+        self._bits = b""     # decoded payloads stay read-only bytes until the first write
+        self._count = 0
+        if daily_progress:
+            self._load(daily_progress)
+
+    def _load(self, daily_progress):
+        # Bulk build: the range and goal table are sized up front, then bits are set in place.
+        days = [(to_ordinal(date_str), statuses) for date_str, statuses in daily_progress.items()]
+        goals = dict.fromkeys(goal for _, statuses in days for goal in statuses)
+        self._goals = list(goals)
+        self._goal_ids = {goal: goal_id for goal_id, goal in enumerate(self._goals)}
+        self._ensure_range(min(ordinal for ordinal, _ in days), max(ordinal for ordinal, _ in days))
+        bits, stride, start, goal_ids = self._bits, self._stride, self._start, self._goal_ids
+        for ordinal, statuses in days:
+            day = ordinal - start
+            index, mask = day >> 3, 1 << (day & 7)
+            bits[index] |= mask
+            for goal, status in statuses.items():
+                tracked = (1 + 2 * goal_ids[goal]) * stride + index
+                bits[tracked] |= mask
+                if status:
+                    bits[tracked + stride] |= mask
+        self._count = int.from_bytes(bits[:stride], "little").bit_count()
+
+    # --- Bit plumbing ---
+    def _planes(self):
+        return 1 + 2 * len(self._goals)
+
+    def _position(self, plane, ordinal):
+        day = ordinal - self._start
+        if day < 0 or day >= self._stride * 8:
+            return None, 0
+        return plane * self._stride + (day >> 3), 1 << (day & 7)
+
+    def _bit(self, plane, ordinal):
+        index, mask = self._position(plane, ordinal)
+        return index is not None and bool(self._bits[index] & mask)
+
+    def _set_bit(self, plane, ordinal, value):
+        index, mask = self._position(plane, ordinal)
+        if value:
+            self._bits[index] |= mask
+        else:
+            self._bits[index] &= ~mask & 0xFF
+
+    def _writable(self):
+        if not isinstance(self._bits, bytearray):
+            self._bits = bytearray(self._bits)
+
+    def _ensure_range(self, first, last):
+        if self._stride and self._start <= first and last < self._start + self._stride * 8:
+            return
+        start = min(first, self._start) if self._stride else first
+        start -= start % 8
+        end = max(last + 1, self._start + self._stride * 8) if self._stride else last + 1
+        # Grow geometrically so appending one day at a time stays amortised O(1).
+        stride = max(MIN_STRIDE, -(-(end - start) // 8), self._stride * 2)
+        shift = (self._start - start) // 8 if self._stride else 0
+        bits = bytearray(self._planes() * stride)
+        for plane in range(self._planes()):
+            old = self._bits[plane * self._stride:(plane + 1) * self._stride]
+            bits[plane * stride + shift:plane * stride + shift + len(old)] = old
+        self._start, self._stride, self._bits = start, stride, bits
+
+    def _goal_id(self, goal):
+        goal_id = self._goal_ids.get(goal)
+        if goal_id is None:
+            self._writable()
+            goal_id = self._goal_ids[goal] = len(self._goals)
+            self._goals.append(goal)
+            self._bits.extend(bytes(2 * self._stride))
+        return goal_id
+
+    def _status(self, ordinal, goal):
+        goal_id = self._goal_ids.get(goal)
+        if goal_id is None or not self._bit(1 + 2 * goal_id, ordinal):
+            return None
+        return self._bit(2 + 2 * goal_id, ordinal)
+
+    def _set_status(self, ordinal, goal, status):
+        self._ensure_range(ordinal, ordinal)
+        self._writable()
+        goal_id = self._goal_id(goal)
+        self._mark_day(ordinal)
+        self._set_bit(1 + 2 * goal_id, ordinal, True)
+        self._set_bit(2 + 2 * goal_id, ordinal, bool(status))
+
+    def _clear_status(self, ordinal, goal):
+        goal_id = self._goal_ids.get(goal)
+        if goal_id is None or not self._bit(1 + 2 * goal_id, ordinal):
+            return False
+        self._writable()
+        self._set_bit(1 + 2 * goal_id, ordinal, False)
+        self._set_bit(2 + 2 * goal_id, ordinal, False)
+        return True
+
+    def _day_items(self, ordinal):
+        index, mask = self._position(0, ordinal)
+        if index is None:
+            return []
+        bits, stride = self._bits, self._stride
+        return [
+            (goal, bool(bits[(2 + 2 * goal_id) * stride + index] & mask))
+            for goal_id, goal in enumerate(self._goals)
+            if bits[(1 + 2 * goal_id) * stride + index] & mask
+        ]
+
+    def _iter_goals(self, ordinal):
+        return iter([goal for goal, _ in self._day_items(ordinal)])
+
+    def _mark_day(self, ordinal):
+        if not self._bit(0, ordinal):
+            self._set_bit(0, ordinal, True)
+            self._count += 1
+
+    def _iter_ordinals(self):
+        present = bytes(self._bits[:self._stride])  # a copy, so callers may write while iterating
+        for index, byte in enumerate(present):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield self._start + index * 8 + bit
+
+    # --- Mapping API ---
+    def __getitem__(self, date_str):
+        try:
+            ordinal = to_ordinal(date_str)
+        except (TypeError, ValueError):
+            raise KeyError(date_str) from None
+        if not self._bit(0, ordinal):
+            raise KeyError(date_str)
+        return DayStatuses(self, ordinal)
+
+    def __setitem__(self, date_str, statuses):
+        ordinal = to_ordinal(date_str)
+        items = list(statuses.items())  # `statuses` may be a view of this very day
+        self._ensure_range(ordinal, ordinal)
+        self._writable()
+        for plane in range(1, self._planes()):
+            self._set_bit(plane, ordinal, False)
+        self._mark_day(ordinal)
+        for goal, status in items:
+            self._set_status(ordinal, goal, status)
+
+    def __delitem__(self, date_str):
+        ordinal = to_ordinal(date_str)
+        if not self._bit(0, ordinal):
+            raise KeyError(date_str)
+        self._writable()
+        for plane in range(self._planes()):
+            self._set_bit(plane, ordinal, False)
+        self._count -= 1
+
+    def setdefault(self, date_str, default=None):
+        # Hand back the live view, not `default`, so edits to the result are stored.
+        if date_str not in self:
+            self[date_str] = default or {}
+        return self[date_str]
+
+    def __contains__(self, date_str):
+        try:
+            return self._bit(0, to_ordinal(date_str))
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        return (date_key(ordinal) for ordinal in self._iter_ordinals())
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f"CompactProgress({self.to_dict()!r})"
+
+    def bit_planes(self):
+        # (first ordinal, bytes per plane, goal names, plane buffer) for vectorised readers.
+        # Bit d of a plane (little-endian within each byte) is day `first ordinal + d`.
+        return self._start, self._stride, tuple(self._goals), bytes(self._bits)
+
+    def to_dict(self):
+        return {date_str: dict(statuses) for date_str, statuses in self.items()}
+
+    # --- Encoding ---
+    def encode(self):
+        # Planes are trimmed to the last day with an entry before compressing.
+        ordinals = list(self._iter_ordinals())
+        used = (ordinals[-1] - self._start) // 8 + 1 if ordinals else 0
+        payload = b"".join(
+            bytes(self._bits[plane * self._stride:plane * self._stride + used]) for plane in range(self._planes())
+        )
+        return {
+            "encoding": ENCODING,
+            "start": date_key(self._start) if ordinals else None,
+            "stride": used,
+            "goals": list(self._goals),
+            "bits": base64.b64encode(zlib.compress(payload)).decode("ascii"),
+        }
+
+    @classmethod
+    def decode(cls, encoded):
+        progress = cls()
+        stride = encoded["stride"]
+        if not stride:
+            return progress
+        progress._goals = list(encoded["goals"])
+        progress._goal_ids = {goal: goal_id for goal_id, goal in enumerate(progress._goals)}
+        progress._start = to_ordinal(encoded["start"])
+        progress._stride = stride
+        progress._bits = zlib.decompress(base64.b64decode(encoded["bits"]))
+        if len(progress._bits) != progress._planes() * stride:
+            raise ValueError("Encoded progress does not match its goal table.")
+        progress._count = int.from_bytes(progress._bits[:stride], "little").bit_count()
+        return progress
+
+
+def encode_progress(daily_progress):
+    if not isinstance(daily_progress, CompactProgress):
+        daily_progress = CompactProgress(daily_progress)
+    return daily_progress.encode()
+
+
+def decode_progress(value):
+    # Accepts both the encoded form and a plain {date: {goal: bool}} dict from older files.
+    if is_encoded(value):
+        return CompactProgress.decode(value)
+    return CompactProgress(value)
@@ -0,0 +1,255 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+
+import journal
+import storage
+
+# --- Bulk Import/Export ---
+# Every format carries one row per (username, date, goal). Goals are also exported as rows
+# with an empty date, so goals without any tracked days survive a round trip.
+DATA_DIR = "data"
+ROW_FORMATS = ("parquet", "csv", "ndjson")
+DEFAULT_CHUNK_ROWS = 50000
+FIELDS = ("username", "date", "goal", "completed")
+
+
+def open_store(data_dir, backend_name):
+    return journal.get_journaled_storage(storage.get_storage(data_dir, backend_name))
+
+
+# --- Sources ---
+def iter_store_records(store):
+    # One user in memory at a time.
+    for username in store.list_users():
+        record = store.load_user(username)
+        if record is not None:
+            yield username, record
+
+
+def iter_legacy_json_records(path):
+    # Streams users with ijson when it is installed; otherwise the legacy file is parsed in one go.
+    try:
+        import ijson
+    except ImportError:
+        yield from storage.iter_legacy_records(storage.read_legacy_file(path))
+        return
+    with open(path, "rb") as f:
+        first_key = next((value for prefix, event, value in ijson.parse(f) if event == "map_key"), None)
+    with open(path, "rb") as f:
+        if first_key == "users":
+            for entry in ijson.items(f, "users.item", use_float=True):
+                yield from storage.iter_legacy_records({"users": [entry]})
+        else:
+            for username, record in ijson.kvitems(f, "", use_float=True):
+                yield from storage.iter_legacy_records({username: record})
+
+
+def iter_record_rows(records):
+    for username, record in records:
+        for goal in record.get("goals", []):
+            yield {"username": username, "date": None, "goal": goal, "completed": None}
+        for date_str, statuses in sorted(record.get("daily_progress", {}).items()):
+            for goal, status in statuses.items():
+                yield {"username": username, "date": date_str, "goal": goal, "completed": bool(status)}
+
+
+def iter_chunks(rows, chunk_rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- Writers ---
+def write_ndjson(rows, path, chunk_rows):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in iter_chunks(rows, chunk_rows):
+            f.write("".join(json.dumps(row) + "\n" for row in chunk))
+            count += len(chunk)
+    return count
+
+
+def write_csv(rows, path, chunk_rows):
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for chunk in iter_chunks(rows, chunk_rows):
+            writer.writerows(
+                {**row, "completed": "" if row["completed"] is None else str(row["completed"]).lower()}
+                for row in chunk
+            )
+            count += len(chunk)
+    return count
+
+
+def write_parquet(rows, path, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("username", pa.string()),
+        ("date", pa.date32()),
+        ("goal", pa.string()),
+        ("completed", pa.bool_()),
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(rows, chunk_rows):
+            for row in chunk:
+                row["date"] = datetime.date.fromisoformat(row["date"]) if row["date"] else None
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+WRITERS = {"parquet": write_parquet, "csv": write_csv, "ndjson": write_ndjson}
+
+
+# --- Readers ---
+def read_ndjson(path, chunk_rows):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_csv(path, chunk_rows):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            completed = row.get("completed", "").strip().lower()
+            yield {
+                "username": row["username"],
+                "date": row.get("date") or None,
+                "goal": row["goal"],
+                "completed": None if completed == "" else completed in ("true", "1", "yes"),
+            }
+
+
+def read_parquet(path, chunk_rows):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        for row in batch.to_pylist():
+            if isinstance(row.get("date"), datetime.date):
+                row["date"] = row["date"].isoformat()
+            yield row
+
+
+READERS = {"parquet": read_parquet, "csv": read_csv, "ndjson": read_ndjson}
+
+
+def iter_row_records(rows):
+    # Folds consecutive rows of the same user back into a record; exports are grouped by user.
+    username, record = None, None
+    for row in rows:
+        if row["username"] != username:
+            if record is not None:
+                yield username, record
+            username, record = row["username"], storage.empty_user_record()
+        # Goals come from the goal rows only: progress may mention goals the user has since removed.
+        if row.get("date"):
+            record["daily_progress"].setdefault(row["date"], {})[row["goal"]] = bool(row["completed"])
+        elif row["goal"] not in record["goals"]:
+            record["goals"].append(row["goal"])
+    if record is not None:
+        yield username, record
+
+
+# --- Commands ---
+def merge_records(existing, incoming):
+    merged = dict(existing)
+    merged["goals"] = list(dict.fromkeys(existing.get("goals", []) + incoming["goals"]))
+    progress = {date_str: dict(statuses) for date_str, statuses in existing.get("daily_progress", {}).items()}
+    for date_str, statuses in incoming["daily_progress"].items():
+        progress.setdefault(date_str, {}).update(statuses)
+    merged["daily_progress"] = progress
+    return merged
+
+
+def import_records(store, records, replace=False):
+    imported = set()
+    for username, record in records:
+        with store.user_lock(username):
+            existing = store.load_user(username)
+            # A user split across non-adjacent rows is replaced once, then merged.
+            if existing is not None and (not replace or username in imported):
+                record = merge_records(existing, record)
+            elif existing is not None:
+                record = {**existing, **record}
+            store.save_user(username, record)
+        imported.add(username)
+    return len(imported)
+
+
+def export_command(args):
+    if args.from_json:
+        records = iter_legacy_json_records(args.from_json)
+    else:
+        records = iter_store_records(open_store(args.data_dir, args.storage))
+    count = WRITERS[args.format](iter_record_rows(records), args.output, args.chunk_rows)
+    print(f"Exported {count} rows to {args.output}.")
+
+
+def import_command(args):
+    store = open_store(args.data_dir, args.storage)
+    if args.format == "json":
+        records = iter_legacy_json_records(args.input)
+    else:
+        records = iter_row_records(READERS[args.format](args.input, args.chunk_rows))
+    count = import_records(store, records, replace=args.replace)
+    print(f"Imported {count} users into the '{store.name}' store at {args.data_dir}.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Bulk import/export of Habit Tracker goals and daily progress.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--storage",
+        choices=sorted(storage.BACKENDS),
+        default=os.environ.get("HABIT_TRACKER_STORAGE", storage.DEFAULT_BACKEND),
+    )
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write every user's goals and progress as rows.")
+    export_parser.add_argument("--format", choices=ROW_FORMATS, required=True)
+    export_parser.add_argument("--output", required=True)
+    export_parser.add_argument(
+        "--from-json", metavar="PATH",
+        help="Read a legacy user_data.json (either layout) instead of the configured store.",
+    )
+    export_parser.set_defaults(handler=export_command)
+
+    import_parser = commands.add_parser("import", help="Load rows (or a legacy user_data.json) into the store.")
+    import_parser.add_argument("--format", choices=ROW_FORMATS + ("json",), required=True)
+    import_parser.add_argument("--input", required=True)
+    import_parser.add_argument(
+        "--replace", action="store_true",
+        help="Replace each imported user's goals and progress instead of merging.",
+    )
+    import_parser.set_defaults(handler=import_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except (storage.StorageError, OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import html
+
+# --- Plain HTML Tables ---
+# The markup DataFrame.to_html(index=False) produced for the report pages, built without
+# pandas (or st.table, which imports it) so those pages stay light to open.
+TABLE_CLASS = "dataframe"
+
+
+def table_html(rows, columns=None, escape=True):
+    # `rows` are dicts; columns default to the keys of the first row, in order. With
+    # escape=False cell values are inserted as-is, for pre-formatted HTML such as coloured spans.
+    columns = list(columns) if columns is not None else list(rows[0]) if rows else []
+    cell = html.escape if escape else str
+    header = "".join(f"<th>{html.escape(str(column))}</th>" for column in columns)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{cell(str(row.get(column, '')))}</td>" for column in columns) + "</tr>"
+        for row in rows
+    )
+    return (
+        f'<table border="1" class="{TABLE_CLASS}">'
+        f'<thead><tr style="text-align: right;">{header}</tr></thead>'
+        f"<tbody>{body}</tbody></table>"
+    )
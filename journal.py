@@ -0,0 +1,209 @@
+import datetime
+import json
+import os
+import queue
+import threading
+from urllib.parse import quote, unquote
+
+import storage
+
+# --- Journal Configuration ---
+JOURNAL_DIR_NAME = "journal"
+ARCHIVE_DIR_NAME = "archive"
+JOURNAL_EXT = ".ndjson"
+COMPACT_AFTER_EVENTS = 500
+
+
+def make_progress_event(date_str, goal, status):
+    # status None records that the goal was dropped from that day's entry.
+    return {
+        "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "date": date_str,
+        "goal": goal,
+        "status": status,
+    }
+
+
+def apply_progress_events(daily_progress, events):
+    for event in events:
+        day = daily_progress.setdefault(event["date"], {})
+        if event["status"] is None:
+            day.pop(event["goal"], None)
+        else:
+            day[event["goal"]] = bool(event["status"])
+    return daily_progress
+
+
+def _ends_with_torn_line(path):
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except FileNotFoundError:
+        return False
+
+
+class JournaledStorage:
+    # Wraps a storage backend: progress saves append events to a per-user journal,
+    # loads replay the journal over the last snapshot, and a background worker folds
+    # long journals back into the snapshot (archiving the events for auditing).
+
+    def __init__(self, backend, compact_after=COMPACT_AFTER_EVENTS):
+        self.backend = backend
+        self.compact_after = compact_after
+        self.journal_dir = os.path.join(backend.data_dir, JOURNAL_DIR_NAME)
+        self.archive_dir = os.path.join(self.journal_dir, ARCHIVE_DIR_NAME)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._event_counts = {}
+        self._compaction_queue = queue.Queue()
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+        self._worker = None
+
+    # --- Delegated backend API ---
+    @property
+    def name(self):
+        return self.backend.name
+
+    @property
+    def data_dir(self):
+        return self.backend.data_dir
+
+    @property
+    def migration_error(self):
+        return self.backend.migration_error
+
+    def user_lock(self, username):
+        return self.backend.user_lock(username)
+
+    def list_users(self):
+        users = set(self.backend.list_users())
+        for name in os.listdir(self.journal_dir):
+            if name.endswith(JOURNAL_EXT):
+                users.add(unquote(name[:-len(JOURNAL_EXT)]))
+        return sorted(users)
+
+    def user_stamp(self, username):
+        return self.backend.user_stamp(username), storage.file_stamp(self.journal_path(username))
+
+    # --- Journal files ---
+    def journal_path(self, username):
+        return os.path.join(self.journal_dir, quote(username, safe="") + JOURNAL_EXT)
+
+    def archive_path(self, username):
+        return os.path.join(self.archive_dir, quote(username, safe="") + JOURNAL_EXT)
+
+    def read_events(self, username):
+        events = []
+        try:
+            with open(self.journal_path(username), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A line torn by a crash mid-append; the events around it are intact.
+                        continue
+        except FileNotFoundError:
+            pass
+        self._event_counts[username] = len(events)
+        return events
+
+    def _archive_journal(self, username):
+        path = self.journal_path(username)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as src, open(self.archive_path(username), "ab") as dst:
+            dst.write(src.read())
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(path)
+        self._event_counts[username] = 0
+
+    # --- Record API ---
+    def load_user(self, username):
+        with self.user_lock(username):
+            record = self.backend.load_user(username)
+            events = self.read_events(username)
+            if events:
+                record = record if record is not None else storage.empty_user_record()
+                apply_progress_events(record.setdefault("daily_progress", {}), events)
+            return record
+
+    def save_user(self, username, record, expected_version=None):
+        with self.user_lock(username):
+            if expected_version is not None and self.compact(username):
+                # Appends do not bump the version, so the caller may not have seen them. Folding
+                # them into the snapshot does, and the caller retries against the result.
+                raise storage.VersionConflict(
+                    username, expected_version, storage.record_version(self.backend.load_user(username))
+                )
+            version = self.backend.save_user(username, record, expected_version=expected_version)
+            self._archive_journal(username)
+            return version
+
+    def append_progress(self, username, events):
+        if not events:
+            return
+        payload = "".join(json.dumps(event) + "\n" for event in events)
+        with self.user_lock(username):
+            if username not in self._event_counts:
+                self.read_events(username)
+            path = self.journal_path(username)
+            if _ends_with_torn_line(path):
+                payload = "\n" + payload
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self._event_counts[username] += len(events)
+            if self._event_counts[username] >= self.compact_after:
+                self.schedule_compaction(username)
+
+    # --- Compaction ---
+    def compact(self, username):
+        with self.user_lock(username):
+            if not self.read_events(username):
+                return False
+            record = self.load_user(username)
+            self.save_user(username, record)
+            return True
+
+    def compact_all(self):
+        return sum(1 for username in self.list_users() if self.compact(username))
+
+    def schedule_compaction(self, username):
+        with self._queued_lock:
+            if username in self._queued:
+                return
+            self._queued.add(username)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._compaction_loop, name="journal-compactor", daemon=True)
+                self._worker.start()
+        self._compaction_queue.put(username)
+
+    def _compaction_loop(self):
+        while True:
+            username = self._compaction_queue.get()
+            with self._queued_lock:
+                self._queued.discard(username)
+            try:
+                self.compact(username)
+            except Exception:
+                # The journal is still intact; compaction is retried on the next append.
+                pass
+            finally:
+                self._compaction_queue.task_done()
+
+
+_JOURNALS = {}
+_JOURNALS_LOCK = threading.Lock()
+
+
+def get_journaled_storage(backend):
+    with _JOURNALS_LOCK:
+        if id(backend) not in _JOURNALS:
+            _JOURNALS[id(backend)] = JournaledStorage(backend)
+        return _JOURNALS[id(backend)]
@@ -0,0 +1,190 @@
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import analytics
+import journal
+import storage
+
+# --- Leaderboard Batch Job ---
+# Per-user and per-team completion, streaks and rankings across every stored user, computed
+# offline (or every few minutes with --every) and written to one summary file, so the Team
+# page only has to read that file. Users are summarised in chunks by a process pool; each
+# worker opens the store itself and keeps one user in memory at a time.
+DATA_DIR = "data"
+SUMMARY_FILE_NAME = "leaderboard.json"
+TEAMS_FILE_NAME = "teams.json"  # {"<team>": ["<username>", ...]}; "# ..." notes are allowed
+DEFAULT_TEAM = "Everyone"
+WINDOW_DAYS = 30
+CHUNK_USERS = 1000
+
+
+def summary_path(data_dir):
+    return os.path.join(data_dir, SUMMARY_FILE_NAME)
+
+
+def load_teams(data_dir):
+    # username -> team; users missing from teams.json fall into DEFAULT_TEAM.
+    path = os.path.join(data_dir, TEAMS_FILE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        teams = json.loads(storage.strip_json_comments(f.read()))
+    if not isinstance(teams, dict):
+        raise storage.StorageError(f"{path} must map team names to lists of usernames.")
+    return {str(username).lower(): team for team, members in teams.items() for username in members}
+
+
+def load_summary(data_dir):
+    path = summary_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- Per-user summaries ---
+def summarize_user(username, record, today, window_days=WINDOW_DAYS):
+    matrix = analytics.ProgressMatrix.from_progress(record.get("goals", []), record.get("daily_progress", {}))
+    last, first = analytics.to_day(today), analytics.to_day(today) - np.timedelta64(window_days - 1, "D")
+    in_window = matrix.tracked_any & (matrix.dates >= first) & (matrix.dates <= last)
+    current, longest = matrix.perfect_day_streaks(today)
+    return {
+        "username": username,
+        "goals": len(matrix.goals),
+        "completion": round(float(matrix.percentages[in_window].mean()), 1) if in_window.any() else 0.0,
+        "tracked_days": int(in_window.sum()),
+        "all_time_completion": (
+            round(float(matrix.percentages[matrix.tracked_any].mean()), 1) if matrix.tracked_any.any() else 0.0
+        ),
+        "current_streak": current,
+        "longest_streak": longest,
+    }
+
+
+def summarize_chunk(data_dir, backend_name, usernames, today_str, window_days):
+    # Runs in a worker process: fresh store objects, as a separate app process would have.
+    store = journal.JournaledStorage(storage.BACKENDS[backend_name](data_dir))
+    today = datetime.date.fromisoformat(today_str)
+    rows = []
+    for username in usernames:
+        record = store.load_user(username)
+        if record is not None:
+            rows.append(summarize_user(username, record, today, window_days))
+    return rows
+
+
+# --- Rankings ---
+def rank_rows(rows, key, name_field):
+    # Standard competition ranking ("1224"): ties share a rank and are listed by name.
+    rows.sort(key=lambda row: (key(row), row[name_field]))
+    previous, rank = None, 0
+    for position, row in enumerate(rows, 1):
+        if key(row) != previous:
+            previous, rank = key(row), position
+        row["rank"] = rank
+    return rows
+
+
+def team_rollups(users):
+    teams = {}
+    for row in users:
+        teams.setdefault(row["team"], []).append(row)
+    rollups = []
+    for team, members in teams.items():
+        active = [row for row in members if row["tracked_days"]]
+        leader = min(members, key=lambda row: row["rank"])
+        rollups.append({
+            "team": team,
+            "members": len(members),
+            "active_members": len(active),
+            "completion": round(sum(row["completion"] for row in active) / len(active), 1) if active else 0.0,
+            "tracked_days": sum(row["tracked_days"] for row in members),
+            "best_streak": max(row["current_streak"] for row in members),
+            "top_user": leader["username"],
+        })
+    return rank_rows(rollups, lambda row: (-row["completion"], -row["active_members"]), "team")
+
+
+def build_leaderboard(data_dir, backend_name=None, workers=None, today=None, window_days=WINDOW_DAYS, chunk_users=CHUNK_USERS):
+    started = time.perf_counter()
+    # Opening through get_storage runs any pending legacy migration once, before the workers start.
+    # Users are listed through the journal: some exist only as events not yet compacted.
+    store = journal.get_journaled_storage(storage.get_storage(data_dir, backend_name))
+    today = today or datetime.date.today()
+    usernames = sorted(store.list_users())
+    chunks = [usernames[i:i + chunk_users] for i in range(0, len(usernames), chunk_users)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    args = (data_dir, store.name)
+    if workers <= 1:
+        rows = [row for chunk in chunks for row in summarize_chunk(*args, chunk, today.isoformat(), window_days)]
+    else:
+        # spawn, not fork: the job may be started from a threaded app process.
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(summarize_chunk, *args, chunk, today.isoformat(), window_days) for chunk in chunks]
+            rows = [row for future in futures for row in future.result()]
+
+    teams = load_teams(data_dir)
+    for row in rows:
+        row["team"] = teams.get(row["username"], DEFAULT_TEAM)
+    users = rank_rows(rows, lambda row: (-row["completion"], -row["current_streak"]), "username")
+    summary = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "as_of": today.isoformat(),
+        "window_days": window_days,
+        "storage": store.name,
+        "workers": max(workers, 1),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "users": users,
+        "teams": team_rollups(users),
+    }
+    storage.atomic_write_json(summary_path(data_dir), summary)
+    return summary
+
+
+# --- Command line ---
+def build_parser():
+    parser = argparse.ArgumentParser(description="Compute the Habit Tracker team leaderboard summary file.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--storage",
+        choices=sorted(storage.BACKENDS),
+        default=os.environ.get("HABIT_TRACKER_STORAGE", storage.DEFAULT_BACKEND),
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--chunk-users", type=int, default=CHUNK_USERS, help="Users per worker task.")
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="Keep running, rebuilding on this interval.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    while True:
+        try:
+            summary = build_leaderboard(
+                args.data_dir, args.storage, args.workers, window_days=args.window_days, chunk_users=args.chunk_users
+            )
+        except (storage.StorageError, OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            if not args.every:
+                return 1
+        else:
+            print(
+                f"Ranked {len(summary['users'])} users in {len(summary['teams'])} teams "
+                f"in {summary['elapsed_seconds']:.2f}s -> {summary_path(args.data_dir)}"
+            )
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Profiling Configuration ---
+METRIC_NAME = "habit_tracker_span_seconds"
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class SpanStats:
+    # Thread-safe aggregate per span name: count, total, max and cumulative histogram buckets.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {"count": 0, "total": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+            span["count"] += 1
+            span["total"] += seconds
+            span["max"] = max(span["max"], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    span["buckets"][i] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    "count": span["count"],
+                    "total_seconds": span["total"],
+                    "mean_seconds": span["total"] / span["count"],
+                    "max_seconds": span["max"],
+                    "buckets": dict(zip(BUCKETS, span["buckets"])),
+                }
+                for name, span in sorted(self._spans.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+
+PROCESS_STATS = SpanStats()
+_session_stats = contextvars.ContextVar("session_stats", default=None)
+_rerun_trace = contextvars.ContextVar("rerun_trace", default=None)
+_depth = contextvars.ContextVar("span_depth", default=0)
+
+
+def begin_rerun(session_stats):
+    # Streamlit runs each session's script on its own thread, so context variables keep
+    # sessions apart. Returns the list that collects this rerun's spans.
+    trace = []
+    _session_stats.set(session_stats)
+    _rerun_trace.set(trace)
+    _depth.set(0)
+    return trace
+
+
+@contextmanager
+def span(name):
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        _depth.reset(token)
+        PROCESS_STATS.record(name, seconds)
+        session_stats = _session_stats.get()
+        if session_stats is not None:
+            session_stats.record(name, seconds)
+        trace = _rerun_trace.get()
+        if trace is not None:
+            trace.append({"span": name, "seconds": seconds, "depth": depth, "start": started})
+
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Exporters ---
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(snapshot, scope="process"):
+    lines = [
+        f"# HELP {METRIC_NAME} Wall-clock time spent in instrumented Habit Tracker code paths.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for name, stats in snapshot.items():
+        labels = f'span="{_escape_label(name)}",scope="{scope}"'
+        for bound, count in stats["buckets"].items():
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+        lines.append(f"{METRIC_NAME}_sum{{{labels}}} {stats['total_seconds']:.6f}")
+        lines.append(f"{METRIC_NAME}_count{{{labels}}} {stats['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json(snapshot, **extra):
+    # Bucket bounds become strings so the payload round-trips through JSON.
+    spans = {
+        name: {**stats, "buckets": {str(bound): count for bound, count in stats["buckets"].items()}}
+        for name, stats in snapshot.items()
+    }
+    return json.dumps({"timestamp": time.time(), **extra, "spans": spans})
+
+
+def append_json_log(path, trace, **extra):
+    line = json.dumps({"timestamp": time.time(), **extra, "spans": [
+        {"span": entry["span"], "seconds": entry["seconds"], "depth": entry["depth"]} for entry in trace
+    ]})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
@@ -0,0 +1,254 @@
+import datetime
+
+import compact_progress
+
+
+def week_key(ordinal):
+    iso = datetime.date.fromordinal(ordinal).isocalendar()
+    return f"{iso[0]}-W{iso[1]:02d}"
+
+
+def month_key(ordinal):
+    return datetime.date.fromordinal(ordinal).strftime("%Y-%m")
+
+
+class GoalStreaks:
+    # Runs of consecutive completed days kept as interval maps, so marking or unmarking a
+    # day merges or splits at most two runs instead of rescanning the goal's history.
+
+    def __init__(self):
+        self.days = set()
+        self.run_ends = {}    # run start -> run end
+        self.run_starts = {}  # run end -> run start
+        self.longest = 0
+
+    def add(self, day):
+        if day in self.days:
+            return
+        self.days.add(day)
+        start = self.run_starts.pop(day - 1, day)
+        end = self.run_ends.pop(day + 1, day)
+        self.run_ends[start] = end
+        self.run_starts[end] = start
+        self.longest = max(self.longest, end - start + 1)
+
+    def discard(self, day):
+        if day not in self.days:
+            return
+        self.days.discard(day)
+        if day in self.run_starts:
+            start = self.run_starts[day]
+        else:
+            # Unmarking inside a run (rare): walk back to where it starts.
+            start = day
+            while start - 1 in self.days:
+                start -= 1
+        end = self.run_ends.pop(start)
+        del self.run_starts[end]
+        if start < day:
+            self.run_ends[start] = day - 1
+            self.run_starts[day - 1] = start
+        if day < end:
+            self.run_ends[day + 1] = end
+            self.run_starts[end] = day + 1
+        if end - start + 1 == self.longest:
+            self.longest = max((e - s + 1 for s, e in self.run_ends.items()), default=0)
+
+    def current(self, today):
+        # A streak is still alive if today or yesterday closes it.
+        for end in (today, today - 1):
+            if end in self.run_starts:
+                return end - self.run_starts[end] + 1
+        return 0
+
+
+class GoalIndex:
+    # The user's goals as an ordered set, plus how many days have an entry for each goal name
+    # (current goals or not) and the first and last of them. Adding, removing and "in use"
+    # checks are O(1); a saved day costs O(goals on that day).
+
+    def __init__(self, goals):
+        self.goals = dict.fromkeys(goals)
+        self.counts = {}  # goal -> days with an entry
+        self.first = {}
+        self.last = {}
+
+    def __contains__(self, goal):
+        return goal in self.goals
+
+    def __iter__(self):
+        return iter(self.goals)
+
+    def __len__(self):
+        return len(self.goals)
+
+    def add(self, goal):
+        if goal in self.goals:
+            return False
+        self.goals[goal] = None
+        return True
+
+    def remove(self, goal):
+        if goal not in self.goals:
+            return False
+        del self.goals[goal]
+        return True
+
+    def update_day(self, ordinal, statuses, previous, daily_progress):
+        # `previous` is the day's entry before the change, `daily_progress` the history after it.
+        for goal in statuses:
+            if goal not in previous:
+                self.counts[goal] = self.counts.get(goal, 0) + 1
+                self.first[goal] = min(self.first.get(goal, ordinal), ordinal)
+                self.last[goal] = max(self.last.get(goal, ordinal), ordinal)
+        for goal in previous:
+            if goal in statuses or goal not in self.counts:
+                continue
+            self.counts[goal] -= 1
+            if not self.counts[goal]:
+                del self.counts[goal], self.first[goal], self.last[goal]
+            elif ordinal == self.first[goal]:
+                self.first[goal] = next(self.tracked_days(goal, daily_progress))
+            elif ordinal == self.last[goal]:
+                self.last[goal] = next(self.tracked_days(goal, daily_progress, reverse=True))
+
+    def in_use(self, goal):
+        return goal in self.counts
+
+    def tracked_days(self, goal, daily_progress, reverse=False):
+        # Ordinals of the days with an entry for the goal: a walk over its first-to-last range.
+        if goal not in self.counts:
+            return
+        days = range(self.first[goal], self.last[goal] + 1)
+        for ordinal in reversed(days) if reverse else days:
+            if goal in daily_progress.get(compact_progress.date_key(ordinal), ()):
+                yield ordinal
+
+    def tracked_range(self, goal):
+        if goal not in self.counts:
+            return None
+        return datetime.date.fromordinal(self.first[goal]), datetime.date.fromordinal(self.last[goal])
+
+
+class ProgressIndex:
+    # Per-user counts kept in step with daily_progress: per-day completion, weekly and
+    # monthly rollups, and per-goal streaks. Saving a day costs O(goals); every report
+    # is a handful of dictionary lookups.
+
+    def __init__(self, goals, daily_progress):
+        self.rebuild(goals, daily_progress)
+
+    def rebuild(self, goals, daily_progress):
+        self.goals = GoalIndex(goals)
+        self.days = {}
+        self.weekly = {}
+        self.monthly = {}
+        self.streaks = {goal: GoalStreaks() for goal in self.goals}
+        for date_str in daily_progress:
+            self.update_day(date_str, daily_progress)
+
+    # --- Incremental updates ---
+    def update_day(self, date_str, daily_progress, previous=None):
+        # Folds in daily_progress[date_str] after a save; `previous` is the entry the index last
+        # saw for that day (none on a first pass).
+        ordinal = compact_progress.to_ordinal(date_str)
+        statuses = daily_progress.get(date_str, {})
+        self.goals.update_day(ordinal, statuses, previous or {}, daily_progress)
+        self._count_day(ordinal, statuses)
+
+    def _count_day(self, ordinal, statuses):
+        previous = self.days.get(ordinal)
+        if previous is not None:
+            self._apply_rollups(ordinal, previous, -1)
+        tracked = {goal: bool(status) for goal, status in statuses.items() if goal in self.goals}
+        entry = (sum(tracked.values()), len(tracked), bool(statuses))
+        self.days[ordinal] = entry
+        self._apply_rollups(ordinal, entry, 1)
+        for goal, streak in self.streaks.items():
+            if tracked.get(goal):
+                streak.add(ordinal)
+            else:
+                streak.discard(ordinal)
+
+    def add_goal(self, goal, daily_progress):
+        # Only the days that already mention the goal (usually none) need recounting.
+        if not self.goals.add(goal):
+            return False
+        self.streaks[goal] = GoalStreaks()
+        self._recount(goal, daily_progress)
+        return True
+
+    def remove_goal(self, goal, daily_progress):
+        if not self.goals.remove(goal):
+            return False
+        del self.streaks[goal]
+        self._recount(goal, daily_progress)
+        return True
+
+    def _recount(self, goal, daily_progress):
+        for ordinal in list(self.goals.tracked_days(goal, daily_progress)):
+            self._count_day(ordinal, daily_progress[compact_progress.date_key(ordinal)])
+
+    def _apply_rollups(self, ordinal, entry, sign):
+        done, tracked, has_entry = entry
+        percentage = (done / tracked) * 100 if tracked else 0.0
+        for rollups, key in ((self.weekly, week_key(ordinal)), (self.monthly, month_key(ordinal))):
+            rollup = rollups.setdefault(key, {"tracked_days": 0, "tracked_sum": 0.0, "entry_days": 0, "entry_sum": 0.0})
+            if tracked:
+                rollup["tracked_days"] += sign
+                rollup["tracked_sum"] += sign * percentage
+            if percentage > 0 or has_entry:
+                rollup["entry_days"] += sign
+                rollup["entry_sum"] += sign * percentage
+
+    # --- Lookups ---
+    def completion_on(self, date):
+        done, tracked, _ = self.days.get(date.toordinal(), (0, 0, False))
+        return (done / tracked) * 100 if tracked else 0.0
+
+    def completion_range(self, start, end):
+        return [
+            (datetime.date.fromordinal(ordinal), self.completion_on(datetime.date.fromordinal(ordinal)))
+            for ordinal in range(start.toordinal(), end.toordinal() + 1)
+        ]
+
+    def recent_average(self, days, today):
+        # Mean completion over the last `days` days that tracked any current goal.
+        percentages = [
+            self.completion_on(datetime.date.fromordinal(ordinal))
+            for ordinal in range(today.toordinal() - days + 1, today.toordinal() + 1)
+            if self.days.get(ordinal, (0, 0, False))[1]
+        ]
+        return sum(percentages) / len(percentages) if percentages else 0
+
+    def week_summary(self, start_of_week):
+        # Average, best and worst day of an ISO week, counting days with some completion
+        # or any entry at all (the Weekly Summary's notion of a tracked day).
+        rollup = self.weekly.get(week_key(start_of_week.toordinal()))
+        if not rollup or not rollup["entry_days"]:
+            return {"days": 0, "average": 0.0, "min": 0.0, "max": 0.0}
+        meaningful = []
+        for ordinal in range(start_of_week.toordinal(), start_of_week.toordinal() + 7):
+            done, tracked, has_entry = self.days.get(ordinal, (0, 0, False))
+            percentage = (done / tracked) * 100 if tracked else 0.0
+            if percentage > 0 or has_entry:
+                meaningful.append(percentage)
+        return {
+            "days": rollup["entry_days"],
+            "average": rollup["entry_sum"] / rollup["entry_days"],
+            "min": min(meaningful),
+            "max": max(meaningful),
+        }
+
+    def month_average(self, year, month):
+        rollup = self.monthly.get(f"{year}-{month:02d}")
+        if not rollup or not rollup["tracked_days"]:
+            return 0.0
+        return rollup["tracked_sum"] / rollup["tracked_days"]
+
+    def goal_streaks(self, today):
+        today_ordinal = today.toordinal()
+        return {
+            goal: {"current": streak.current(today_ordinal), "longest": streak.longest}
+            for goal, streak in self.streaks.items()
+        }
@@ -0,0 +1,280 @@
+import argparse
+import datetime
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+import storage
+
+# --- Quote Service ---
+# Quotes live one per line in a text file, optionally prefixed with category tags:
+#     [habits, focus] We are what we repeatedly do. - Aristotle
+# Blank lines and "# ..." lines are skipped. A sidecar index (<file>.idx) holds the byte
+# offset of every quote and, per tag, the numbers of its quotes; it is memory-mapped, so
+# picking a quote reads one offset and one line however large the file is. The index is
+# rebuilt whenever the file's size or mtime changes, and a QuoteBook notices that by itself.
+QUOTES_FILE = os.path.join("data", "quotes.txt")
+INDEX_SUFFIX = ".idx"
+CHECK_INTERVAL_SECONDS = 2.0
+
+INDEX_MAGIC = b"QTI1"
+_INDEX_HEADER = struct.Struct("<4sQQQI")  # magic, source size, source mtime_ns, quote count, tag table bytes
+_OFFSET = struct.Struct("<Q")
+_MEMBER = struct.Struct("<I")
+
+Quote = namedtuple("Quote", "number text tags")
+
+
+def parse_line(line):
+    # (text, tags) for one raw line, or None for blank and comment lines.
+    text = line.decode("utf-8", errors="replace").strip().lstrip("\ufeff")
+    if not text or text.startswith("#"):
+        return None
+    tags = ()
+    if text.startswith("[") and "]" in text:
+        head, _, rest = text[1:].partition("]")
+        tags = tuple(tag.strip().lower() for tag in head.split(",") if tag.strip())
+        text = rest.strip()
+    return (text, tags) if text else None
+
+
+def index_path(path):
+    return path + INDEX_SUFFIX
+
+
+# --- Index build ---
+def build_index(f):
+    # One pass over an open binary file; returns the index bytes (header, tag table, offsets,
+    # members) stamped with the file's size and mtime.
+    stat = os.fstat(f.fileno())
+    offsets, members = array("Q"), {}
+    f.seek(0)
+    position = 0
+    for line in f:
+        stripped = line.strip()
+        if position == 0:
+            stripped = stripped.lstrip(b"\xef\xbb\xbf").strip()
+        # Most lines are plain quotes; only tagged ones are decoded here.
+        if stripped and not stripped.startswith(b"#"):
+            head, bracket, rest = stripped[1:].partition(b"]") if stripped.startswith(b"[") else (b"", b"", b"")
+            if bracket and not rest.strip():
+                position += len(line)
+                continue  # tags but no quote
+            for tag in head.decode("utf-8", errors="replace").lower().split(",") if bracket else ():
+                if tag.strip():
+                    members.setdefault(tag.strip(), array("I")).append(len(offsets))
+            offsets.append(position)
+        position += len(line)
+    table, grouped, first = {}, array("I"), 0
+    for tag in sorted(members):
+        table[tag] = [first, len(members[tag])]
+        grouped.extend(members[tag])
+        first += len(members[tag])
+    table_bytes = json.dumps(table).encode("utf-8")
+    table_bytes += b" " * (-(_INDEX_HEADER.size + len(table_bytes)) % _OFFSET.size)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        grouped.byteswap()
+    header = _INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets), len(table_bytes))
+    return header + table_bytes + offsets.tobytes() + grouped.tobytes()
+
+
+def _index_matches(index, stat):
+    try:
+        magic, size, mtime_ns, _, _ = _INDEX_HEADER.unpack_from(index, 0)
+    except struct.error:
+        return False
+    return magic == INDEX_MAGIC and (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+
+def _read_index(path, f):
+    # The sidecar if it describes this version of the file, else a fresh build that is saved for
+    # the next process. When the directory is read-only the index just stays in memory.
+    sidecar = index_path(path)
+    stat = os.fstat(f.fileno())
+    try:
+        with open(sidecar, "rb") as index_file:
+            index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if _index_matches(index, stat):
+            return index
+        index.close()
+    except (OSError, ValueError):
+        pass
+    index = build_index(f)
+    try:
+        storage.atomic_write_bytes(sidecar, index)
+    except OSError:
+        pass
+    return index
+
+
+class _Snapshot:
+    # One version of the quotes file: its open handle and index, read-only once built.
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        stat = os.fstat(self.file.fileno())
+        self.stamp = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.index = _read_index(path, self.file)
+        _, _, _, self.count, table_bytes = _INDEX_HEADER.unpack_from(self.index, 0)
+        table_start = _INDEX_HEADER.size
+        self.tags = json.loads(bytes(self.index[table_start:table_start + table_bytes]))
+        self.offsets_start = table_start + table_bytes
+        self.members_start = self.offsets_start + self.count * _OFFSET.size
+
+    def quote_number(self, position, tag=None):
+        if tag is None:
+            return position
+        first, _ = self.tags[tag]
+        return _MEMBER.unpack_from(self.index, self.members_start + (first + position) * _MEMBER.size)[0]
+
+    def read(self, number):
+        offset = _OFFSET.unpack_from(self.index, self.offsets_start + number * _OFFSET.size)[0]
+        self.file.seek(offset)
+        parsed = parse_line(self.file.readline())
+        text, tags = parsed if parsed is not None else ("", ())
+        return Quote(number, text, tags)
+
+    def close(self):
+        self.file.close()
+        if hasattr(self.index, "close"):
+            self.index.close()
+
+
+class QuoteBook:
+    # Thread-safe reader over one quotes file. Picks are deterministic per (day, user, category)
+    # and use their own Random instance, so the process-wide random module is left alone.
+
+    def __init__(self, path=QUOTES_FILE, check_interval=CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def _current(self):
+        # Called with the lock held. Raises FileNotFoundError when the file has never been readable.
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self._snapshot is None:
+                    raise
+                return self._snapshot  # mid-save by an editor; keep the last version
+            if self._snapshot is None or self._snapshot.stamp != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                self._reload()
+        return self._snapshot
+
+    def _reload(self):
+        snapshot = _Snapshot(self.path)
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot = snapshot
+
+    def reload(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._reload()
+
+    def __len__(self):
+        with self._lock:
+            return self._current().count
+
+    def tags(self):
+        # {tag: number of quotes}
+        with self._lock:
+            return {tag: count for tag, (_, count) in self._current().tags.items()}
+
+    def get(self, number):
+        with self._lock:
+            snapshot = self._current()
+            if not 0 <= number < snapshot.count:
+                raise IndexError(f"Quote {number} is out of range (0-{snapshot.count - 1}).")
+            return snapshot.read(number)
+
+    def pick(self, seed, tag=None):
+        # None when the file (or the tag) has no quotes.
+        with self._lock:
+            snapshot = self._current()
+            tag = tag.lower() if tag else None
+            available = snapshot.tags.get(tag, (0, 0))[1] if tag else snapshot.count
+            if not available:
+                return None
+            position = random.Random(seed).randrange(available)
+            return snapshot.read(snapshot.quote_number(position, tag))
+
+    def daily_quote(self, day=None, username=None, tag=None):
+        # The same quote all day for a user; username=None gives everyone the same one.
+        day = day or datetime.date.today()
+        return self.pick(f"{day.isoformat()}|{(username or '').lower()}|{(tag or '').lower()}", tag)
+
+    def close(self):
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
+
+
+# --- Command line ---
+def index_command(args):
+    book = QuoteBook(args.file)
+    started = time.perf_counter()
+    book.reload()
+    print(f"{len(book)} quotes, {len(book.tags())} tags, indexed in {time.perf_counter() - started:.3f}s "
+          f"({index_path(args.file)}).")
+
+
+def pick_command(args):
+    day = datetime.date.fromisoformat(args.date) if args.date else None
+    quote = QuoteBook(args.file).daily_quote(day, args.user, args.tag)
+    if quote is None:
+        print("No matching quotes.", file=sys.stderr)
+        return 1
+    print(quote.text)
+    return 0
+
+
+def tags_command(args):
+    for tag, count in sorted(QuoteBook(args.file).tags().items()):
+        print(f"{tag}\t{count}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Index and pick Habit Tracker quotes.")
+    parser.add_argument("--file", default=QUOTES_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Build (or validate) the offset index.")
+    index_parser.set_defaults(handler=index_command)
+
+    pick_parser = commands.add_parser("pick", help="Print the quote of the day.")
+    pick_parser.add_argument("--date", help="YYYY-MM-DD (default: today).")
+    pick_parser.add_argument("--user", help="Pick for this user instead of everyone.")
+    pick_parser.add_argument("--tag", help="Only quotes with this category tag.")
+    pick_parser.set_defaults(handler=pick_command)
+
+    tags_parser = commands.add_parser("tags", help="List category tags and their quote counts.")
+    tags_parser.set_defaults(handler=tags_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args) or 0
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import journal
+import storage
+
+# --- Cache Configuration ---
+# How long a cached record is trusted before its on-disk stamp is checked again.
+REVALIDATE_SECONDS = 2.0
+MAX_CACHED_USERS = 10000
+
+
+class _Entry:
+    # Records are held JSON-encoded in their compact on-disk form: decoding a fresh copy is
+    # several times cheaper than deepcopy, and a cached user costs a few kilobytes.
+    __slots__ = ("payload", "stamp", "checked_at")
+
+    def __init__(self, payload, stamp, checked_at):
+        self.payload = payload
+        self.stamp = stamp
+        self.checked_at = checked_at
+
+
+class CachedStorage:
+    # Process-wide, thread-safe cache of user records in front of a store. Writes go
+    # through to the store and refresh the cache; a record is re-read only when the
+    # store's stamp for that user (mtime/size) shows someone else changed it.
+
+    def __init__(self, store, revalidate_after=REVALIDATE_SECONDS, max_users=MAX_CACHED_USERS):
+        self.store = store
+        self.revalidate_after = revalidate_after
+        self.max_users = max_users
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --- Delegated store API ---
+    @property
+    def name(self):
+        return self.store.name
+
+    @property
+    def data_dir(self):
+        return self.store.data_dir
+
+    @property
+    def migration_error(self):
+        return self.store.migration_error
+
+    def user_lock(self, username):
+        return self.store.user_lock(username)
+
+    def user_stamp(self, username):
+        return self.store.user_stamp(username)
+
+    def list_users(self):
+        return self.store.list_users()
+
+    # --- Cache bookkeeping ---
+    def _remember(self, username, record, stamp):
+        with self._lock:
+            self._entries[username] = _Entry(json.dumps(storage.encode_record(record)), stamp, time.monotonic())
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def _fresh_entry(self, username):
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            self._entries.move_to_end(username)
+        now = time.monotonic()
+        if now - entry.checked_at < self.revalidate_after:
+            return entry
+        if self.store.user_stamp(username) == entry.stamp:
+            entry.checked_at = now
+            return entry
+        return None
+
+    def invalidate(self, username=None):
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+    # --- Record API ---
+    def load_user(self, username):
+        # Callers get their own copy: session state mutates records in place.
+        entry = self._fresh_entry(username)
+        if entry is not None:
+            self.hits += 1
+            return storage.decode_record(json.loads(entry.payload))
+        with self.user_lock(username):
+            self.misses += 1
+            # Stamp first, so a write racing with this read forces another reload later.
+            stamp = self.store.user_stamp(username)
+            record = self.store.load_user(username)
+            self._remember(username, record, stamp)
+            return record
+
+    def save_user(self, username, record, expected_version=None):
+        with self.user_lock(username):
+            try:
+                version = self.store.save_user(username, record, expected_version=expected_version)
+            except storage.VersionConflict:
+                # Our copy is stale; the caller's retry must see the stored record.
+                self.invalidate(username)
+                raise
+            self._remember(username, record, self.store.user_stamp(username))
+            return version
+
+    def append_progress(self, username, events):
+        with self.user_lock(username):
+            entry = self._fresh_entry(username)
+            # The entry may be trusted without a stamp check; patch it only if nobody else has
+            # written since, or the new stamp would hide their write.
+            current = entry is not None and self.store.user_stamp(username) == entry.stamp
+            self.store.append_progress(username, events)
+            if not current:
+                self.invalidate(username)
+                return
+            record = storage.decode_record(json.loads(entry.payload)) or storage.empty_user_record()
+            journal.apply_progress_events(record.setdefault("daily_progress", {}), events)
+            self._remember(username, record, self.store.user_stamp(username))
+
+    def stats(self):
+        with self._lock:
+            return {"users": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,765 @@
+import copy
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import zlib
+from urllib.parse import quote, unquote
+
+import compact_progress
+
+# --- Storage Configuration ---
+LEGACY_FILE_NAME = "user_data.json"
+MIGRATED_SUFFIX = ".migrated"
+SHARDS_DIR_NAME = "users"
+SHARD_EXT = ".json"
+SQLITE_FILE_NAME = "user_data.sqlite3"
+LOCKS_DIR_NAME = "locks"
+HISTORY_FILE_NAME = "history.bin"
+HISTORY_INDEX_NAME = "history.idx"
+INITIAL_INDEX_SLOTS = 1024
+HISTORY_COMPACT_MIN_BYTES = 4 * 1024 * 1024  # compact once at least half of this much is dead
+HISTORY_MAGIC = b"HBIN"
+INDEX_MAGIC = b"HIDX"
+RECORD_MAGIC = b"HREC"
+_HISTORY_HEADER = struct.Struct("<4sQ")     # magic, generation
+_INDEX_HEADER = struct.Struct("<4sQQQQQ")   # magic, generation, slots, used slots, live bytes, data end
+_RECORD_HEADER = struct.Struct("<4sIII")    # magic, crc32 of name + payload, name length, payload length
+_SLOT = struct.Struct("<QQQ")               # name hash (0 = empty), record offset, record length
+DEFAULT_BACKEND = "shards"
+MAX_SAVE_ATTEMPTS = 20
+
+
+class StorageError(Exception):
+    pass
+
+
+class VersionConflict(StorageError):
+    def __init__(self, username, expected_version, actual_version):
+        super().__init__(
+            f"Data for user '{username}' changed concurrently (expected version {expected_version}, found {actual_version})."
+        )
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+
+
+def record_version(record):
+    return (record or {}).get("version", 0)
+
+
+def empty_user_record():
+    return {"goals": [], "daily_progress": {}}
+
+
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def atomic_write_json(path, data, indent=None):
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path, data):
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def strip_json_comments(text):
+    # Hand-edited data files carry "# ..." notes after values; drop them outside strings.
+    out = []
+    in_string = escaped = in_comment = False
+    for ch in text:
+        if in_comment:
+            if ch == "\n":
+                in_comment = False
+                out.append(ch)
+            continue
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch == "#":
+            in_comment = True
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def encode_record(record):
+    # The on-disk form of a record: daily_progress as compact bit planes (see compact_progress).
+    if record is None or "daily_progress" not in record:
+        return record
+    return {**record, "daily_progress": compact_progress.encode_progress(record["daily_progress"])}
+
+
+def decode_record(record):
+    if record is None or "daily_progress" not in record:
+        return record
+    record["daily_progress"] = compact_progress.decode_progress(record["daily_progress"])
+    return record
+
+
+def plain_record(record):
+    # For the legacy file, which other tools read as plain JSON.
+    progress = record.get("daily_progress")
+    if isinstance(progress, compact_progress.CompactProgress):
+        return {**record, "daily_progress": progress.to_dict()}
+    return record
+
+
+def read_legacy_file(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(strip_json_comments(text))
+    except json.JSONDecodeError as e:
+        raise StorageError(f"User data file is corrupted: {e}") from e
+
+
+# --- Locking ---
+class _UserLock:
+    # In-process RLock plus an OS file lock held by the outermost acquisition, so the lock is
+    # re-entrant within a thread and exclusive across threads and processes.
+
+    def __init__(self, path):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._rlock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            try:
+                self._file = open(self.path, "a+b")
+                _lock_file(self._file)
+            except BaseException:
+                self._depth -= 1
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._rlock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._rlock.release()
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# --- Backends ---
+class StorageBackend:
+    name = None
+    migration_error = None
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.locks_dir = os.path.join(data_dir, LOCKS_DIR_NAME)
+        os.makedirs(self.locks_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def lock_path(self, username):
+        return os.path.join(self.locks_dir, quote(username, safe="") + ".lock")
+
+    def user_lock(self, username):
+        path = self.lock_path(username)
+        with self._locks_guard:
+            lock = self._locks.get(path)
+            if lock is None:
+                lock = self._locks[path] = _UserLock(path)
+        return lock
+
+    def save_user(self, username, record, expected_version=None):
+        # Compare-and-swap on the record version when expected_version is given. The stored
+        # record (and the caller's dict) get the bumped version; it is also returned.
+        with self.user_lock(username):
+            current_version = record_version(self.load_user(username))
+            if expected_version is not None and expected_version != current_version:
+                raise VersionConflict(username, expected_version, current_version)
+            record["version"] = current_version + 1
+            self._write_user(username, record)
+            return record["version"]
+
+    def _write_user(self, username, record):
+        raise NotImplementedError
+
+    def load_user(self, username):
+        raise NotImplementedError
+
+    def list_users(self):
+        raise NotImplementedError
+
+    def user_stamp(self, username):
+        # Cheap token that changes whenever the user's stored record does (e.g. file mtime/size).
+        raise NotImplementedError
+
+
+class LegacyJsonBackend(StorageBackend):
+    # The original layout: one username-keyed JSON document rewritten on every save.
+    name = "json"
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.path = os.path.join(data_dir, LEGACY_FILE_NAME)
+
+    def lock_path(self, username):
+        # Every save rewrites the shared file, so all users share one lock.
+        return os.path.join(self.locks_dir, LEGACY_FILE_NAME + ".lock")
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        return dict(iter_legacy_records(read_legacy_file(self.path)))
+
+    def load_all(self):
+        with self.user_lock(None):
+            return self._read()
+
+    def load_user(self, username):
+        return self.load_all().get(username)
+
+    def save_user(self, username, record, expected_version=None):
+        with self.user_lock(username):
+            all_data = self._read()
+            current_version = record_version(all_data.get(username))
+            if expected_version is not None and expected_version != current_version:
+                raise VersionConflict(username, expected_version, current_version)
+            record["version"] = current_version + 1
+            all_data[username] = plain_record(record)
+            atomic_write_json(self.path, all_data, indent=4)
+            return record["version"]
+
+    def list_users(self):
+        return list(self.load_all())
+
+    def user_stamp(self, username):
+        return file_stamp(self.path)
+
+
+class ShardedJsonBackend(StorageBackend):
+    # One small JSON file per user, so a save only rewrites that user's shard.
+    name = "shards"
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.shards_dir = os.path.join(data_dir, SHARDS_DIR_NAME)
+        os.makedirs(self.shards_dir, exist_ok=True)
+
+    def shard_path(self, username):
+        return os.path.join(self.shards_dir, quote(username, safe="") + SHARD_EXT)
+
+    def load_user(self, username):
+        path = self.shard_path(username)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return decode_record(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, ValueError, zlib.error) as e:
+            raise StorageError(f"Data for user '{username}' is corrupted: {e}") from e
+
+    def _write_user(self, username, record):
+        atomic_write_json(self.shard_path(username), encode_record(record))
+
+    def list_users(self):
+        return sorted(
+            unquote(name[:-len(SHARD_EXT)])
+            for name in os.listdir(self.shards_dir)
+            if name.endswith(SHARD_EXT) and not name.startswith(".")
+        )
+
+    def user_stamp(self, username):
+        return file_stamp(self.shard_path(username))
+
+
+class SqliteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.path = os.path.join(data_dir, SQLITE_FILE_NAME)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users "
+                "(username TEXT PRIMARY KEY, record TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+            if "version" not in columns:
+                conn.execute("ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_user(self, username):
+        row = self._connection().execute(
+            "SELECT record FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if not row:
+            return None
+        try:
+            return decode_record(json.loads(row[0]))
+        except (ValueError, zlib.error) as e:
+            raise StorageError(f"Data for user '{username}' is corrupted: {e}") from e
+
+    def save_user(self, username, record, expected_version=None):
+        # The version column is checked and bumped inside one write transaction.
+        with self.user_lock(username):
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                row = conn.execute("SELECT version FROM users WHERE username = ?", (username,)).fetchone()
+                current_version = row[0] if row else 0
+                if expected_version is not None and expected_version != current_version:
+                    raise VersionConflict(username, expected_version, current_version)
+                record["version"] = current_version + 1
+                conn.execute(
+                    "INSERT INTO users (username, record, version) VALUES (?, ?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET record = excluded.record, version = excluded.version",
+                    (username, json.dumps(encode_record(record)), record["version"]),
+                )
+            return record["version"]
+
+    def list_users(self):
+        rows = self._connection().execute("SELECT username FROM users ORDER BY username")
+        return [row[0] for row in rows]
+
+    def user_stamp(self, username):
+        # Commits land in the WAL first, so together the two files reflect every write.
+        return file_stamp(self.path), file_stamp(self.path + "-wal")
+
+
+class MappedHistoryBackend(StorageBackend):
+    # Every user's record in one append-only file (history.bin) plus an open-addressing hash
+    # index of name hash -> (offset, length) in history.idx. Both are memory-mapped, so a
+    # login reads one slot and one record and cold start does not grow with the user count.
+    # Rewritten records leave dead bytes behind that compaction reclaims.
+    name = "history"
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.path = os.path.join(data_dir, HISTORY_FILE_NAME)
+        self.index_path = os.path.join(data_dir, HISTORY_INDEX_NAME)
+        self._file_lock = _UserLock(os.path.join(self.locks_dir, HISTORY_FILE_NAME + ".lock"))
+        self._maps = {}
+        self._maps_lock = threading.Lock()
+        with self._file_lock:
+            if not os.path.exists(self.path):
+                self._write_files(1, [], INITIAL_INDEX_SLOTS)
+            elif not self._index_is_valid():
+                self._rebuild_index()
+            else:
+                self._truncate_torn_tail()
+
+    # --- Mapped files ---
+    def _mapped(self, path, refresh=False):
+        # Remapped when the file was replaced (compaction, index growth) or has grown.
+        stat = os.stat(path)
+        with self._maps_lock:
+            current = self._maps.get(path)
+            if refresh or current is None or current[0] != stat.st_ino or current[1] < stat.st_size:
+                with open(path, "rb") as f:
+                    current = self._maps[path] = (stat.st_ino, stat.st_size, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            return current[2]
+
+    def _release_maps(self):
+        # Called before a file is truncated or replaced: Windows refuses both while this
+        # process still maps the file. Readers holding a closed map retry under the lock.
+        with self._maps_lock:
+            maps, self._maps = self._maps, {}
+        for _, _, mapped in maps.values():
+            mapped.close()
+
+    def _index_header(self, index):
+        magic, generation, slots, used, live_bytes, data_end = _INDEX_HEADER.unpack_from(index, 0)
+        if magic != INDEX_MAGIC:
+            raise StorageError("History index is corrupted.")
+        return generation, slots, used, live_bytes, data_end
+
+    def _index_is_valid(self):
+        try:
+            index, data = self._mapped(self.index_path, True), self._mapped(self.path, True)
+            generation, slots, _, _, data_end = self._index_header(index)
+            return (
+                len(index) == _INDEX_HEADER.size + slots * _SLOT.size
+                and _HISTORY_HEADER.unpack_from(data, 0) == (HISTORY_MAGIC, generation)
+                and data_end <= len(data)
+            )
+        except (OSError, ValueError, struct.error, StorageError):
+            return False
+
+    def _read_record(self, data, offset, length):
+        # Returns (username, payload bytes), or None if the bytes are not an intact record.
+        if offset + length > len(data) or length < _RECORD_HEADER.size:
+            return None
+        magic, crc, name_length, payload_length = _RECORD_HEADER.unpack_from(data, offset)
+        if magic != RECORD_MAGIC or _RECORD_HEADER.size + name_length + payload_length != length:
+            return None
+        body = data[offset + _RECORD_HEADER.size:offset + length]
+        if zlib.crc32(body) != crc:
+            return None
+        return body[:name_length].decode("utf-8"), body[name_length:]
+
+    def _find(self, username, index, data):
+        # (slot number, offset, length, payload); offset is None when the user is absent.
+        generation, slots, _, _, _ = self._index_header(index)
+        if _HISTORY_HEADER.unpack_from(data, 0) != (HISTORY_MAGIC, generation):
+            raise _StaleMapping()
+        name_hash = _name_hash(username)
+        slot = name_hash % slots
+        while True:
+            slot_hash, offset, length = _SLOT.unpack_from(index, _INDEX_HEADER.size + slot * _SLOT.size)
+            if slot_hash == 0:
+                return slot, None, 0, None
+            if slot_hash == name_hash:
+                found = self._read_record(data, offset, length)
+                if found is None:
+                    raise _StaleMapping()
+                if found[0] == username:
+                    return slot, offset, length, found[1]
+            slot = (slot + 1) % slots
+
+    def _lookup(self, username):
+        try:
+            return self._find(username, self._mapped(self.index_path), self._mapped(self.path))
+        except (_StaleMapping, ValueError):
+            # Caught mid-compaction or mid-write (a map closed under us raises ValueError): look
+            # again under the lock.
+            with self._file_lock:
+                try:
+                    return self._find(username, self._mapped(self.index_path, True), self._mapped(self.path, True))
+                except _StaleMapping:
+                    raise StorageError("History index does not match the history file.") from None
+
+    # --- Writes (all under the store-wide file lock) ---
+    def _write_files(self, generation, records, slots):
+        # Writes a fresh data file and index holding `records` [(username, payload)].
+        while len(records) * 2 > slots:
+            slots *= 2
+        index = bytearray(_INDEX_HEADER.size + slots * _SLOT.size)
+        data = bytearray(_HISTORY_HEADER.pack(HISTORY_MAGIC, generation))
+        for username, payload in records:
+            offset = len(data)
+            data += _pack_record(username, payload)
+            _place_slot(index, slots, _name_hash(username), offset, len(data) - offset)
+        live_bytes = len(data) - _HISTORY_HEADER.size
+        _INDEX_HEADER.pack_into(index, 0, INDEX_MAGIC, generation, slots, len(records), live_bytes, len(data))
+        # Data first: until the new index lands, readers see mismatched generations and wait.
+        self._release_maps()
+        atomic_write_bytes(self.path, data)
+        atomic_write_bytes(self.index_path, index)
+
+    def _live_records(self, index, data):
+        _, slots, _, _, _ = self._index_header(index)
+        records = []
+        for slot in range(slots):
+            slot_hash, offset, length = _SLOT.unpack_from(index, _INDEX_HEADER.size + slot * _SLOT.size)
+            if slot_hash:
+                found = self._read_record(data, offset, length)
+                if found is not None:
+                    records.append(found)
+        return records
+
+    def _rebuild_index(self):
+        # The data file is the source of truth: replay it, keeping each user's last intact record.
+        data = self._mapped(self.path, True)
+        try:
+            magic, generation = _HISTORY_HEADER.unpack_from(data, 0)
+        except struct.error:
+            magic, generation = None, 0
+        if magic != HISTORY_MAGIC:
+            raise StorageError("History file is corrupted.")
+        latest, offset = {}, _HISTORY_HEADER.size
+        while offset + _RECORD_HEADER.size <= len(data):
+            _, _, name_length, payload_length = _RECORD_HEADER.unpack_from(data, offset)
+            length = _RECORD_HEADER.size + name_length + payload_length
+            found = self._read_record(data, offset, length)
+            if found is None:
+                break  # a torn append; nothing after it was committed
+            latest[found[0]] = found[1]
+            offset += length
+        self._write_files(generation + 1, sorted(latest.items()), INITIAL_INDEX_SLOTS)
+
+    def _truncate_torn_tail(self):
+        # Bytes past data_end belong to an append that crashed before its index update.
+        data_end = self._index_header(self._mapped(self.index_path, True))[4]
+        if os.path.getsize(self.path) > data_end:
+            self._release_maps()
+            with open(self.path, "r+b") as f:
+                f.truncate(data_end)
+
+    def _write_user(self, username, record):
+        payload = json.dumps(encode_record(record)).encode("utf-8")
+        with self._file_lock:
+            index, data = self._mapped(self.index_path, True), self._mapped(self.path, True)
+            generation, slots, used, live_bytes, data_end = self._index_header(index)
+            slot, old_offset, old_length, _ = self._find(username, index, data)
+            if old_offset is None and (used + 1) * 2 > slots:
+                self._write_files(generation + 1, self._live_records(index, data), slots * 2)
+                self._write_user(username, record)
+                return
+            entry = _pack_record(username, payload)
+            self._release_maps()
+            with open(self.path, "r+b") as f:
+                f.seek(data_end)
+                f.write(entry)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+            used += old_offset is None
+            live_bytes += len(entry) - old_length
+            data_end += len(entry)
+            with open(self.index_path, "r+b") as f:
+                f.seek(_INDEX_HEADER.size + slot * _SLOT.size)
+                f.write(_SLOT.pack(_name_hash(username), data_end - len(entry), len(entry)))
+                f.seek(0)
+                f.write(_INDEX_HEADER.pack(INDEX_MAGIC, generation, slots, used, live_bytes, data_end))
+                f.flush()
+                os.fsync(f.fileno())
+            if data_end > HISTORY_COMPACT_MIN_BYTES and live_bytes * 2 < data_end:
+                self.compact()
+
+    def compact(self):
+        with self._file_lock:
+            index, data = self._mapped(self.index_path, True), self._mapped(self.path, True)
+            generation, slots, _, _, _ = self._index_header(index)
+            self._write_files(generation + 1, self._live_records(index, data), slots)
+
+    # --- Record API ---
+    def load_user(self, username):
+        _, offset, _, payload = self._lookup(username)
+        if offset is None:
+            return None
+        try:
+            return decode_record(json.loads(payload))
+        except (ValueError, zlib.error) as e:
+            raise StorageError(f"Data for user '{username}' is corrupted: {e}") from e
+
+    def list_users(self):
+        with self._file_lock:
+            index, data = self._mapped(self.index_path, True), self._mapped(self.path, True)
+            return sorted(username for username, _ in self._live_records(index, data))
+
+    def user_stamp(self, username):
+        # The record's position changes on every save; the generation on every compaction.
+        _, offset, length, _ = self._lookup(username)
+        try:
+            generation = self._index_header(self._mapped(self.index_path))[0]
+        except ValueError:
+            with self._file_lock:
+                return self._index_header(self._mapped(self.index_path, True))[0], *self._lookup(username)[1:3]
+        return generation, offset, length
+
+
+class _StaleMapping(Exception):
+    pass
+
+
+def _name_hash(username):
+    # 64-bit hash with the top bit set, so 0 can mark an empty slot.
+    digest = hashlib.blake2b(username.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 1 << 63
+
+
+def _pack_record(username, payload):
+    name = username.encode("utf-8")
+    body = name + payload
+    return _RECORD_HEADER.pack(RECORD_MAGIC, zlib.crc32(body), len(name), len(payload)) + body
+
+
+def _place_slot(index, slots, name_hash, offset, length):
+    slot = name_hash % slots
+    while _SLOT.unpack_from(index, _INDEX_HEADER.size + slot * _SLOT.size)[0]:
+        slot = (slot + 1) % slots
+    _SLOT.pack_into(index, _INDEX_HEADER.size + slot * _SLOT.size, name_hash, offset, length)
+
+
+BACKENDS = {
+    LegacyJsonBackend.name: LegacyJsonBackend,
+    ShardedJsonBackend.name: ShardedJsonBackend,
+    SqliteBackend.name: SqliteBackend,
+    MappedHistoryBackend.name: MappedHistoryBackend,
+}
+
+
+# --- Versioned saves ---
+def merge_user_records(base, mine, theirs):
+    # Three-way merge at (date, goal) granularity. `base` is what this session last loaded or
+    # saved, `mine` its edited copy and `theirs` the stored record. Edits made only on one side
+    # are combined; when both sides changed the same entry, this session's edit wins and the
+    # entry is counted as a conflict.
+    base, theirs = base or empty_user_record(), theirs or empty_user_record()
+    merged = copy.deepcopy(theirs)
+    conflicts = 0
+
+    base_goals, my_goals = base.get("goals", []), mine.get("goals", [])
+    removed = set(base_goals) - set(my_goals)
+    goals = [goal for goal in merged.get("goals", []) if goal not in removed]
+    goals += [goal for goal in my_goals if goal not in base_goals and goal not in goals]
+    merged["goals"] = goals
+
+    base_progress, my_progress = base.get("daily_progress", {}), mine.get("daily_progress", {})
+    merged_progress = merged.setdefault("daily_progress", {})
+    their_progress = theirs.get("daily_progress", {})
+    for date_str in set(base_progress) | set(my_progress):
+        base_day, my_day = base_progress.get(date_str, {}), my_progress.get(date_str, {})
+        if base_day == my_day:
+            continue
+        their_day = their_progress.get(date_str, {})
+        for goal in set(base_day) | set(my_day):
+            base_status, my_status = base_day.get(goal), my_day.get(goal)
+            if base_status == my_status:
+                continue
+            their_status = their_day.get(goal)
+            if their_status != base_status and their_status != my_status:
+                conflicts += 1
+            day = merged_progress.setdefault(date_str, {})
+            if my_status is None:
+                day.pop(goal, None)
+            else:
+                day[goal] = my_status
+    return merged, conflicts
+
+
+def save_merged(store, username, base, mine, max_attempts=MAX_SAVE_ATTEMPTS):
+    # Optimistic read-merge-write: retried when another writer bumps the version in between.
+    for _ in range(max_attempts):
+        theirs = store.load_user(username)
+        merged, conflicts = merge_user_records(base, mine, theirs)
+        try:
+            store.save_user(username, merged, expected_version=record_version(theirs))
+        except VersionConflict:
+            continue
+        return merged, conflicts
+    raise StorageError(f"Could not save data for user '{username}' after {max_attempts} attempts.")
+
+
+# --- Migration ---
+def iter_legacy_records(legacy_data):
+    # Accepts both layouts seen in the wild: {"<username>": {...}} and {"users": [{"username": ...}, ...]}.
+    if isinstance(legacy_data, dict) and isinstance(legacy_data.get("users"), list):
+        for entry in legacy_data["users"]:
+            if isinstance(entry, dict) and entry.get("username"):
+                record = {k: v for k, v in entry.items() if k != "username"}
+                yield str(entry["username"]).lower(), record
+    elif isinstance(legacy_data, dict):
+        for username, record in legacy_data.items():
+            if isinstance(record, dict):
+                yield username, record
+    else:
+        raise StorageError("Unrecognised user data layout.")
+
+
+def migrate_legacy_file(backend):
+    legacy_path = os.path.join(backend.data_dir, LEGACY_FILE_NAME)
+    if isinstance(backend, LegacyJsonBackend) or not os.path.exists(legacy_path):
+        return 0
+    legacy_data = LegacyJsonBackend(backend.data_dir).load_all()
+    migrated = 0
+    for username, record in iter_legacy_records(legacy_data):
+        with backend.user_lock(username):
+            # Never clobber a user that already has data in the new store.
+            if backend.load_user(username) is None:
+                backend.save_user(username, record)
+                migrated += 1
+    os.replace(legacy_path, legacy_path + MIGRATED_SUFFIX)
+    return migrated
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_storage(data_dir, backend_name=None):
+    backend_name = backend_name or DEFAULT_BACKEND
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend_name}'. Choose from: {', '.join(BACKENDS)}")
+    key = (os.path.abspath(data_dir), backend_name)
+    with _STORES_LOCK:
+        if key not in _STORES:
+            os.makedirs(data_dir, exist_ok=True)
+            backend = BACKENDS[backend_name](data_dir)
+            # A broken legacy file must not take the app down; the caller decides how to report it.
+            try:
+                migrate_legacy_file(backend)
+            except (StorageError, OSError) as e:
+                backend.migration_error = e
+            _STORES[key] = backend
+        return _STORES[key]
@@ -0,0 +1,183 @@
+import datetime
+import http.client
+import json
+
+import pytest
+
+import api_server
+
+PASSWORD = "pw"
+MONDAY = datetime.date(2026, 1, 5)
+
+
+@pytest.fixture
+def api(tmp_path):
+    # flush_interval=0: writes are applied on the request thread, so results are immediate.
+    api = api_server.build_api(str(tmp_path), "shards", flush_interval=0, cost=1000)
+    api.registry.set_password("alice", PASSWORD)
+    yield api
+    api.write_queue.close()
+
+
+def call(api, method, path, body=None, token=None, query=None, client_ip="127.0.0.1"):
+    status, payload, headers = api.dispatch(
+        method, api_server.API_PREFIX + path, query or {}, body, f"Bearer {token}" if token else None, client_ip
+    )
+    return int(status), payload, headers
+
+
+@pytest.fixture
+def token(api):
+    status, payload, _ = call(api, "POST", "/session", {"username": "Alice", "password": PASSWORD})
+    assert status == 200 and payload["username"] == "alice"
+    return payload["token"]
+
+
+# --- Authentication ---
+def test_health_needs_no_token(api):
+    assert call(api, "GET", "/health")[:2] == (200, {"status": "ok", "storage": "shards"})
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer", "Bearer not-a-token", "Basic YWxpY2U6cHc="])
+def test_endpoints_need_a_valid_token(api, authorization):
+    status, payload, headers = api.dispatch("GET", api_server.API_PREFIX + "/goals", {}, None, authorization)
+    assert int(status) == 401
+    assert headers == {"WWW-Authenticate": "Bearer"}
+
+
+def test_bad_credentials_are_refused(api):
+    assert call(api, "POST", "/session", {"username": "alice", "password": "wrong"})[0] == 401
+    assert call(api, "POST", "/session", {"username": "nobody", "password": PASSWORD})[0] == 401
+    assert call(api, "POST", "/session", None)[0] == 401
+
+
+def test_password_change_revokes_tokens(api, token):
+    assert call(api, "GET", "/goals", token=token)[0] == 200
+    api.registry.set_password("alice", "new")
+    assert call(api, "GET", "/goals", token=token)[0] == 401
+
+
+def test_repeated_failures_are_throttled(api):
+    for _ in range(api_server.auth.USER_MAX_FAILURES):
+        assert call(api, "POST", "/session", {"username": "alice", "password": "wrong"})[0] == 401
+    status, payload, headers = call(api, "POST", "/session", {"username": "alice", "password": PASSWORD})
+    assert status == 429
+    assert int(headers["Retry-After"]) > 0
+    assert "error" in payload
+
+
+# --- Goals ---
+def test_goal_lifecycle(api, token):
+    assert call(api, "POST", "/goals", {"goal": " Read "}, token)[:2] == (201, {"goals": ["Read"]})
+    assert call(api, "POST", "/goals", {"goal": "Yoga / stretch"}, token)[0] == 201
+    assert call(api, "POST", "/goals", {"goal": "Read"}, token)[0] == 409
+    assert call(api, "POST", "/goals", {"goal": ""}, token)[0] == 400
+    assert call(api, "DELETE", "/goals/Yoga%20%2F%20stretch", None, token)[:2] == (200, {"goals": ["Read"]})
+    assert call(api, "DELETE", "/goals/Swim", None, token)[0] == 404
+    assert call(api, "GET", "/goals", token=token)[1] == {"goals": ["Read"]}
+
+
+def test_goals_with_progress_cannot_be_removed(api, token):
+    call(api, "POST", "/goals", {"goal": "Read"}, token)
+    call(api, "PUT", f"/progress/{MONDAY}", {"Read": False}, token)
+    assert call(api, "DELETE", "/goals/Read", None, token)[0] == 409
+
+
+# --- Progress ---
+def test_check_ins_and_weekly_stats(api, token):
+    call(api, "POST", "/goals", {"goal": "Read"}, token)
+    call(api, "POST", "/goals", {"goal": "Run"}, token)
+    days = {str(MONDAY): {"Read": True, "Run": True}, str(MONDAY + datetime.timedelta(days=1)): {"Read": True, "Run": False}}
+    status, payload, _ = call(api, "POST", "/progress", {"days": days}, token, {"wait": "1"})
+    assert status == 200 and payload["accepted"] == 4 and payload["durable"]
+    status, payload, _ = call(api, "PUT", f"/progress/{MONDAY}", {"Run": None}, token, {"wait": "1"})
+    assert status == 200
+    query = {"from": str(MONDAY), "to": str(MONDAY + datetime.timedelta(days=6))}
+    progress = call(api, "GET", "/progress", token=token, query=query)[1]["daily_progress"]
+    assert progress == {str(MONDAY): {"Read": True}, str(MONDAY + datetime.timedelta(days=1)): {"Read": True, "Run": False}}
+    stats = call(api, "GET", "/stats/weekly", token=token, query={"date": str(MONDAY + datetime.timedelta(days=3))})[1]
+    assert (stats["start"], stats["tracked_days"], stats["average"], stats["max"], stats["min"]) == (str(MONDAY), 2, 75.0, 100.0, 50.0)
+
+
+@pytest.mark.parametrize("path, body, query, expected", [
+    (f"/progress/{MONDAY}", {"Swim": True}, None, 422),
+    (f"/progress/{MONDAY}", {"Read": 1}, None, 400),
+    (f"/progress/{MONDAY}", ["Read"], None, 400),
+    ("/progress/2026-13-01", {"Read": True}, None, 400),
+    ("/progress", {"days": {}}, None, 400),
+    ("/progress", {"days": {str(MONDAY): {"Read": True}, "someday": {"Read": True}}}, None, 400),
+])
+def test_invalid_check_ins_are_rejected(api, token, path, body, query, expected):
+    call(api, "POST", "/goals", {"goal": "Read"}, token)
+    method = "PUT" if path.startswith("/progress/") else "POST"
+    assert call(api, method, path, body, token, query)[0] == expected
+    assert call(api, "GET", "/status", token=token)[1]["submitted"] == 0  # nothing was queued
+
+
+@pytest.mark.parametrize("query", [{"from": "2026-02-01", "to": "2026-01-01"}, {"from": "yesterday"}, {"from": "2000-01-01", "to": "2026-01-01"}])
+def test_invalid_ranges_are_rejected(api, token, query):
+    assert call(api, "GET", "/progress", token=token, query=query)[0] == 400
+
+
+# --- Dispatch ---
+def test_unknown_endpoints_and_methods(api, token):
+    assert call(api, "GET", "/nothing", token=token)[0] == 404
+    status, _, headers = call(api, "DELETE", "/goals", token=token)
+    assert status == 405
+    assert headers["Allow"] == "GET, POST"
+
+
+def test_unexpected_errors_are_not_leaked(api, token, monkeypatch, capsys):
+    def fail(username):
+        raise RuntimeError("/secret/path/history.bin")
+
+    monkeypatch.setattr(api.store, "load_user", fail)
+    status, payload, _ = call(api, "GET", "/goals", token=token)
+    assert (status, payload) == (500, {"error": "Internal server error"})
+    assert "/secret/path" in capsys.readouterr().err
+
+
+# --- HTTP transport ---
+@pytest.fixture
+def server(api):
+    server = api_server.serve_in_background(api, "127.0.0.1", 0, workers=2)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def http_call(server, method, path, body=b"", headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        conn.putrequest(method, api_server.API_PREFIX + path)
+        for name, value in (headers or {}).items():
+            conn.putheader(name, value)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_http_sign_in_and_read(server):
+    body = json.dumps({"username": "alice", "password": PASSWORD}).encode()
+    status, payload = http_call(server, "POST", "/session", body, {"Content-Length": str(len(body))})
+    assert status == 200
+    status, payload = http_call(server, "GET", "/goals", headers={"Authorization": f"Bearer {payload['token']}"})
+    assert (status, payload) == (200, {"goals": []})
+
+
+@pytest.mark.parametrize("length, body, message", [
+    ("abc", b"", "Content-Length"),
+    ("-5", b"", "Content-Length"),
+    ("9", b"{not json", "not valid JSON"),
+])
+def test_http_malformed_bodies_get_400(server, length, body, message):
+    status, payload = http_call(server, "POST", "/session", body, {"Content-Length": length})
+    assert status == 400
+    assert message in payload["error"]
+
+
+def test_http_oversized_bodies_get_413(server):
+    status, _ = http_call(server, "POST", "/session", b"", {"Content-Length": str(api_server.MAX_BODY_BYTES + 1)})
+    assert status == 413
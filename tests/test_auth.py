@@ -0,0 +1,171 @@
+import os
+import sys
+
+import pytest
+
+import auth
+import storage
+
+FAST_PBKDF2 = 1000
+FAST_SCRYPT = 10
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def without_bcrypt(monkeypatch):
+    # A None entry makes `import bcrypt` raise ImportError.
+    monkeypatch.setitem(sys.modules, "bcrypt", None)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    store = storage.BACKENDS["shards"](str(tmp_path))
+    return auth.UserRegistry(store, b"test-secret", cost=FAST_PBKDF2)
+
+
+# --- Password hashing ---
+@pytest.mark.parametrize("scheme, cost", [("pbkdf2_sha256", FAST_PBKDF2), ("scrypt", FAST_SCRYPT)])
+def test_verify_password_for_hashlib_schemes(scheme, cost):
+    encoded = auth.hash_password("correct horse", scheme, cost)
+    assert encoded.startswith(f"{scheme}${cost}$")
+    assert auth.verify_password("correct horse", encoded)
+    assert not auth.verify_password("correct horsf", encoded)
+    assert encoded != auth.hash_password("correct horse", scheme, cost)  # salted
+
+
+def test_verify_password_for_bcrypt():
+    bcrypt = pytest.importorskip("bcrypt")
+    encoded = bcrypt.hashpw(b"12345", bcrypt.gensalt(rounds=4)).decode("ascii")
+    assert auth.verify_password("12345", encoded)
+    assert not auth.verify_password("54321", encoded)
+
+
+def test_bcrypt_hash_without_bcrypt_installed_is_an_auth_error(without_bcrypt):
+    with pytest.raises(auth.AuthError, match="bcrypt"):
+        auth.verify_password("12345", "$2b$04$" + "a" * 53)
+
+
+@pytest.mark.parametrize("encoded", ["", "plaintext", "pbkdf2_sha256$x$y$z", "pbkdf2_sha256$1000$!!$!!", None])
+def test_malformed_hashes_do_not_verify(encoded):
+    assert not auth.verify_password("anything", encoded)
+
+
+def test_unknown_scheme_is_an_auth_error():
+    with pytest.raises(auth.AuthError):
+        auth.verify_password("x", "md5$1$c2FsdA$ZGlnZXN0")
+
+
+def test_needs_rehash():
+    encoded = auth.hash_password("pw", "pbkdf2_sha256", FAST_PBKDF2)
+    assert not auth.needs_rehash(encoded, "pbkdf2_sha256", FAST_PBKDF2)
+    assert auth.needs_rehash(encoded, "pbkdf2_sha256", FAST_PBKDF2 * 2)
+    assert auth.needs_rehash(encoded, "scrypt", FAST_SCRYPT)
+    assert auth.needs_rehash("$2b$12$" + "a" * 53)
+
+
+def test_bundled_accounts_sign_in_without_bcrypt(without_bcrypt):
+    path = os.path.join(REPO_ROOT, "data", "user_data.json")
+    records = dict(storage.iter_legacy_records(storage.read_legacy_file(path)))
+    hashes = [record["password"] for record in records.values() if record.get("password")]
+    assert hashes
+    for encoded in hashes:
+        assert auth.verify_password("12345", encoded)
+
+
+# --- Session tokens ---
+def test_session_tokens_round_trip_and_expire():
+    signer = auth.SessionSigner(b"secret", ttl=60)
+    token = signer.issue("alice", "tag", now=1000)
+    assert signer.verify(token, now=1030) == ("alice", "tag")
+    assert signer.verify(token, now=1061) is None
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda token: token[:-2] + ("AA" if token[-2:] != "AA" else "BB"),
+    lambda token: "e30." + token.split(".")[1],
+    lambda token: token.replace(".", ""),
+    lambda token: None,
+])
+def test_tampered_tokens_are_rejected(mangle):
+    signer = auth.SessionSigner(b"secret")
+    assert signer.verify(mangle(signer.issue("alice", "tag"))) is None
+
+
+def test_tokens_from_another_secret_are_rejected():
+    token = auth.SessionSigner(b"secret").issue("alice", "tag")
+    assert auth.SessionSigner(b"other").verify(token) is None
+
+
+def test_load_secret_is_created_once(tmp_path, monkeypatch):
+    monkeypatch.delenv("HABIT_TRACKER_SECRET_KEY", raising=False)
+    first = auth.load_secret(str(tmp_path))
+    assert first and auth.load_secret(str(tmp_path)) == first
+    monkeypatch.setenv("HABIT_TRACKER_SECRET_KEY", "configured")
+    assert auth.load_secret(str(tmp_path)) == b"configured"
+
+
+# --- Registry ---
+def test_authenticate_and_tokens(registry):
+    registry.set_password("Alice", "pw")
+    assert registry.authenticate(" ALICE ", "pw") == "alice"
+    assert registry.authenticate("alice", "wrong") is None
+    assert registry.authenticate("nobody", "pw") is None
+    token = registry.issue_token("alice")
+    assert registry.verify_token(token) == "alice"
+    registry.set_password("alice", "new")  # signs out existing sessions
+    assert registry.verify_token(token) is None
+    assert registry.authenticate("alice", "new") == "alice"
+
+
+def test_outdated_hashes_are_upgraded_on_login(registry):
+    registry.set_password_hash("alice", auth.hash_password("pw", "scrypt", FAST_SCRYPT))
+    assert registry.authenticate("alice", "pw") == "alice"
+    upgraded = registry.password_hash("alice")
+    assert upgraded.startswith(f"pbkdf2_sha256${FAST_PBKDF2}$")
+    assert auth.verify_password("pw", upgraded)
+
+
+def test_seed_keeps_existing_hashes(registry):
+    registry.set_password("alice", "mine")
+    seeded = registry.seed({"Alice": auth.hash_password("seed", cost=FAST_PBKDF2), "bob": auth.hash_password("seed", cost=FAST_PBKDF2)})
+    assert seeded == 1
+    assert registry.authenticate("alice", "mine") == "alice"
+    assert registry.authenticate("bob", "seed") == "bob"
+    assert registry.list_users() == ["alice", "bob"]
+
+
+def test_accounts_are_throttled_after_repeated_failures(registry):
+    registry.set_password("alice", "pw")
+    for _ in range(auth.USER_MAX_FAILURES):
+        assert registry.authenticate("alice", "wrong") is None
+    with pytest.raises(auth.ThrottledError) as raised:
+        registry.authenticate("alice", "pw")
+    assert raised.value.key_kind == "account"
+    assert 0 < raised.value.retry_after <= auth.FAILURE_WINDOW_SECONDS
+
+
+def test_success_resets_the_account_throttle(registry):
+    registry.set_password("alice", "pw")
+    for _ in range(auth.USER_MAX_FAILURES - 1):
+        registry.authenticate("alice", "wrong")
+    assert registry.authenticate("alice", "pw") == "alice"
+    assert registry.authenticate("alice", "wrong") is None
+    assert registry.authenticate("alice", "pw") == "alice"
+
+
+def test_addresses_are_throttled_across_accounts(registry):
+    registry.set_password("alice", "pw")
+    for i in range(auth.IP_MAX_FAILURES):
+        registry.authenticate(f"user{i}", "wrong", client_ip="10.0.0.1")
+    with pytest.raises(auth.ThrottledError) as raised:
+        registry.authenticate("alice", "pw", client_ip="10.0.0.1")
+    assert raised.value.key_kind == "address"
+    assert registry.authenticate("alice", "pw", client_ip="10.0.0.2") == "alice"
+
+
+def test_throttle_window_slides():
+    throttle = auth.AttemptThrottle(max_failures=2, window=10)
+    throttle.record_failure("k", now=100)
+    throttle.record_failure("k", now=105)
+    assert throttle.retry_after("k", now=106) == pytest.approx(4)
+    assert throttle.retry_after("k", now=110.5) == 0
@@ -0,0 +1,104 @@
+import copy
+import datetime
+import json
+import random
+
+import pytest
+
+import compact_progress
+from compact_progress import CompactProgress
+
+
+def random_progress(seed, days=400, goals=6):
+    rng = random.Random(seed)
+    names = [f"Goal {i}" for i in range(goals)]
+    start = datetime.date(2024, 12, 29)
+    progress = {}
+    for offset in rng.sample(range(days), days // 3):
+        day = (start + datetime.timedelta(days=offset)).isoformat()
+        progress[day] = {goal: rng.random() < 0.5 for goal in rng.sample(names, rng.randint(0, goals))}
+    return progress
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_encode_decode_round_trip(seed):
+    progress = random_progress(seed)
+    encoded = CompactProgress(progress).encode()
+    # The stored form is plain JSON.
+    decoded = CompactProgress.decode(json.loads(json.dumps(encoded)))
+    assert decoded.to_dict() == progress
+    assert len(decoded) == len(progress)
+    assert sorted(decoded) == sorted(progress)
+
+
+def test_round_trip_keeps_empty_days_and_false_statuses():
+    progress = {"2026-01-01": {}, "2026-01-02": {"Read": False}, "2026-03-31": {"Read": True, "Run": False}}
+    decoded = compact_progress.decode_progress(compact_progress.encode_progress(progress))
+    assert decoded.to_dict() == progress
+    assert "2026-01-01" in decoded and decoded["2026-01-01"] == {}
+
+
+def test_empty_progress_round_trip():
+    encoded = CompactProgress().encode()
+    assert encoded["start"] is None and encoded["stride"] == 0
+    decoded = CompactProgress.decode(encoded)
+    assert len(decoded) == 0 and decoded.to_dict() == {}
+
+
+def test_decode_accepts_plain_dicts():
+    progress = {"2026-02-01": {"Read": True}}
+    decoded = compact_progress.decode_progress(progress)
+    assert isinstance(decoded, CompactProgress)
+    assert decoded.to_dict() == progress
+
+
+def test_edits_after_decode_match_a_dict():
+    expected = random_progress(7)
+    progress = CompactProgress.decode(CompactProgress(expected).encode())
+    rng = random.Random(7)
+    for _ in range(300):
+        day = (datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 900))).isoformat()
+        goal = f"Goal {rng.randint(0, 8)}"
+        action = rng.random()
+        if action < 0.5:
+            progress.setdefault(day, {})[goal] = rng.random() < 0.5
+            expected.setdefault(day, {})[goal] = progress[day][goal]
+        elif action < 0.7 and day in expected:
+            progress[day].pop(goal, None)
+            expected[day].pop(goal, None)
+        elif action < 0.85 and day in expected:
+            del progress[day]
+            del expected[day]
+        else:
+            statuses = {goal: True}
+            progress[day] = statuses
+            expected[day] = dict(statuses)
+    assert progress.to_dict() == expected
+    assert len(progress) == len(expected)
+    assert CompactProgress.decode(progress.encode()).to_dict() == expected
+
+
+def test_day_views_write_through_and_deepcopy_to_dicts():
+    progress = CompactProgress({"2026-01-05": {"Read": False}})
+    day = progress["2026-01-05"]
+    day["Read"] = True
+    day["Run"] = False
+    assert progress.to_dict() == {"2026-01-05": {"Read": True, "Run": False}}
+    copied = copy.deepcopy(progress["2026-01-05"])
+    assert type(copied) is dict and copied == {"Read": True, "Run": False}
+
+
+def test_missing_days_raise_key_error():
+    progress = CompactProgress({"2026-01-05": {"Read": True}})
+    with pytest.raises(KeyError):
+        progress["2026-01-06"]
+    with pytest.raises(KeyError):
+        progress["not a date"]
+    assert progress.get("2026-01-06") is None
+
+
+def test_decode_rejects_a_mismatched_goal_table():
+    encoded = CompactProgress({"2026-01-05": {"Read": True}}).encode()
+    encoded["goals"].append("Run")
+    with pytest.raises(ValueError):
+        CompactProgress.decode(encoded)
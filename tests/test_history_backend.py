@@ -0,0 +1,146 @@
+import os
+import threading
+
+import pytest
+
+import storage
+
+
+def open_store(data_dir):
+    return storage.MappedHistoryBackend(str(data_dir))
+
+
+def record(goal, day="2026-01-01", done=True):
+    return {"goals": [goal], "daily_progress": {day: {goal: done}}}
+
+
+def stored(store, username):
+    loaded = store.load_user(username)
+    return None if loaded is None else {"goals": loaded["goals"], "daily_progress": loaded["daily_progress"].to_dict()}
+
+
+def test_records_survive_reopen(tmp_path):
+    store = open_store(tmp_path)
+    store.save_user("alice", record("Read"))
+    store.save_user("bob", record("Run"))
+    store.save_user("alice", record("Read", done=False))
+    reopened = open_store(tmp_path)
+    assert reopened.list_users() == ["alice", "bob"]
+    assert stored(reopened, "alice") == record("Read", done=False)
+    assert reopened.load_user("alice")["version"] == 2
+    assert reopened.load_user("carol") is None
+
+
+def test_reopen_truncates_a_torn_append(tmp_path):
+    store = open_store(tmp_path)
+    store.save_user("alice", record("Read"))
+    size = os.path.getsize(tmp_path / storage.HISTORY_FILE_NAME)
+    # An append that crashed before its index update.
+    with open(tmp_path / storage.HISTORY_FILE_NAME, "ab") as f:
+        f.write(b"HREC" + os.urandom(40))
+    reopened = open_store(tmp_path)
+    assert os.path.getsize(tmp_path / storage.HISTORY_FILE_NAME) == size
+    assert stored(reopened, "alice") == record("Read")
+    reopened.save_user("bob", record("Run"))
+    assert stored(open_store(tmp_path), "bob") == record("Run")
+
+
+def test_lost_index_is_rebuilt_from_the_data_file(tmp_path):
+    store = open_store(tmp_path)
+    store.save_user("alice", record("Read"))
+    store.save_user("bob", record("Run"))
+    store.save_user("alice", record("Walk"))
+    os.remove(tmp_path / storage.HISTORY_INDEX_NAME)
+    with open(tmp_path / storage.HISTORY_FILE_NAME, "ab") as f:
+        f.write(b"HREC\x00\x00")  # torn tail: dropped by the replay
+    reopened = open_store(tmp_path)
+    assert reopened.list_users() == ["alice", "bob"]
+    assert stored(reopened, "alice") == record("Walk")
+    assert stored(reopened, "bob") == record("Run")
+
+
+def test_corrupted_data_file_is_reported(tmp_path):
+    store = open_store(tmp_path)
+    store.save_user("alice", record("Read"))
+    os.remove(tmp_path / storage.HISTORY_INDEX_NAME)
+    with open(tmp_path / storage.HISTORY_FILE_NAME, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(storage.StorageError):
+        open_store(tmp_path)
+
+
+def test_compaction_drops_dead_records(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(50):
+        store.save_user("alice", record("Read", done=bool(i % 2)))
+    store.save_user("bob", record("Run"))
+    before = os.path.getsize(tmp_path / storage.HISTORY_FILE_NAME)
+    stamp = store.user_stamp("alice")
+    store.compact()
+    assert os.path.getsize(tmp_path / storage.HISTORY_FILE_NAME) < before / 10
+    assert store.user_stamp("alice") != stamp
+    reopened = open_store(tmp_path)
+    assert stored(reopened, "alice") == record("Read", done=True)
+    assert stored(reopened, "bob") == record("Run")
+
+
+def test_index_grows_past_its_initial_slots(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "INITIAL_INDEX_SLOTS", 8)
+    store = open_store(tmp_path)
+    names = [f"user{i:03d}" for i in range(40)]
+    for name in names:
+        store.save_user(name, record(name))
+    reopened = open_store(tmp_path)
+    assert reopened.list_users() == names
+    assert all(stored(reopened, name) == record(name) for name in names)
+
+
+def test_version_conflicts_are_detected(tmp_path):
+    store = open_store(tmp_path)
+    store.save_user("alice", record("Read"))
+    with pytest.raises(storage.VersionConflict):
+        store.save_user("alice", record("Run"), expected_version=0)
+    assert store.save_user("alice", record("Run"), expected_version=1) == 2
+
+
+def test_another_instance_sees_writes_and_compaction(tmp_path):
+    writer, reader = open_store(tmp_path), open_store(tmp_path)
+    writer.save_user("alice", record("Read"))
+    assert stored(reader, "alice") == record("Read")
+    stamp = reader.user_stamp("alice")
+    writer.save_user("alice", record("Run"))
+    writer.compact()
+    assert reader.user_stamp("alice") != stamp
+    assert stored(reader, "alice") == record("Run")
+
+
+def test_readers_survive_concurrent_rewrites(tmp_path):
+    store = open_store(tmp_path)
+    names = [f"user{i}" for i in range(20)]
+    for name in names:
+        store.save_user(name, record(name))
+    errors, stop = [], threading.Event()
+
+    def read():
+        while not stop.is_set():
+            for name in names:
+                try:
+                    assert store.load_user(name)["goals"] == [name]
+                    store.user_stamp(name)
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    try:
+        for i in range(100):
+            store.save_user(names[i % len(names)], record(names[i % len(names)], done=bool(i % 2)))
+            if i % 25 == 0:
+                store.compact()
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+    assert errors == []
@@ -0,0 +1,116 @@
+import copy
+
+import pytest
+
+import storage
+from storage import merge_user_records
+
+
+def record(goals, progress, version=None):
+    result = {"goals": list(goals), "daily_progress": copy.deepcopy(progress)}
+    if version is not None:
+        result["version"] = version
+    return result
+
+
+BASE = record(["Read", "Run"], {"2026-01-01": {"Read": True, "Run": False}})
+
+
+def test_edits_on_both_sides_are_combined():
+    mine = record(["Read", "Run"], {"2026-01-01": {"Read": True, "Run": True}})
+    theirs = record(["Read", "Run"], {"2026-01-01": {"Read": True, "Run": False}, "2026-01-02": {"Read": True}})
+    merged, conflicts = merge_user_records(BASE, mine, theirs)
+    assert conflicts == 0
+    assert merged["daily_progress"] == {"2026-01-01": {"Read": True, "Run": True}, "2026-01-02": {"Read": True}}
+
+
+def test_same_entry_changed_on_both_sides_is_a_conflict_mine_wins():
+    mine = record(["Read", "Run"], {"2026-01-01": {"Read": False, "Run": False}})
+    theirs = record(["Read", "Run"], {"2026-01-01": {"Run": True}})  # they removed Read
+    merged, conflicts = merge_user_records(BASE, mine, theirs)
+    assert conflicts == 1
+    assert merged["daily_progress"]["2026-01-01"] == {"Read": False, "Run": True}
+
+
+def test_identical_edits_are_not_conflicts():
+    mine = record(["Read", "Run"], {"2026-01-01": {"Read": True, "Run": True}})
+    merged, conflicts = merge_user_records(BASE, mine, copy.deepcopy(mine))
+    assert conflicts == 0
+    assert merged["daily_progress"] == mine["daily_progress"]
+
+
+def test_removed_entry_against_their_change_is_a_conflict():
+    mine = record(["Read", "Run"], {"2026-01-01": {"Read": True}})
+    theirs = record(["Read", "Run"], {"2026-01-01": {"Read": True, "Run": True}})
+    merged, conflicts = merge_user_records(BASE, mine, theirs)
+    assert conflicts == 1
+    assert merged["daily_progress"]["2026-01-01"] == {"Read": True}
+
+
+def test_goal_lists_merge_additions_and_removals():
+    mine = record(["Read", "Walk"], BASE["daily_progress"])          # removed Run, added Walk
+    theirs = record(["Read", "Run", "Swim"], BASE["daily_progress"])  # added Swim
+    merged, conflicts = merge_user_records(BASE, mine, theirs)
+    assert conflicts == 0
+    assert merged["goals"] == ["Read", "Swim", "Walk"]
+
+
+def test_unchanged_mine_keeps_theirs_and_other_fields():
+    theirs = record(["Read"], {"2026-01-03": {"Read": False}}, version=4)
+    theirs["password"] = "hash"
+    merged, conflicts = merge_user_records(BASE, copy.deepcopy(BASE), theirs)
+    assert conflicts == 0
+    assert merged == theirs
+    assert merged is not theirs
+
+
+def test_missing_base_and_theirs_start_empty():
+    mine = record(["Read"], {"2026-01-01": {"Read": True}})
+    merged, conflicts = merge_user_records(None, mine, None)
+    assert conflicts == 0
+    assert merged == mine
+
+
+@pytest.mark.parametrize("backend_name", ["shards", "sqlite", "history"])
+def test_save_merged_retries_after_a_concurrent_write(tmp_path, backend_name):
+    store = storage.BACKENDS[backend_name](str(tmp_path))
+    store.save_user("alice", copy.deepcopy(BASE))
+    base = store.load_user("alice")
+
+    class RacingStore:
+        # Another writer saves between our read and our first write.
+        def __init__(self):
+            self.raced = False
+
+        def load_user(self, username):
+            return store.load_user(username)
+
+        def save_user(self, username, record, expected_version=None):
+            if not self.raced:
+                self.raced = True
+                other = store.load_user(username)
+                other["daily_progress"]["2026-01-02"] = {"Run": True}
+                store.save_user(username, other, expected_version=storage.record_version(other))
+            return store.save_user(username, record, expected_version=expected_version)
+
+    mine = record(["Read", "Run"], {"2026-01-01": {"Read": True, "Run": True}})
+    merged, conflicts = storage.save_merged(RacingStore(), "alice", base, mine)
+    assert conflicts == 0
+    stored = store.load_user("alice")
+    assert dict(stored["daily_progress"]["2026-01-01"]) == {"Read": True, "Run": True}
+    assert dict(stored["daily_progress"]["2026-01-02"]) == {"Run": True}
+    assert storage.record_version(stored) == 3
+
+
+def test_save_merged_gives_up_after_max_attempts(tmp_path):
+    store = storage.BACKENDS["shards"](str(tmp_path))
+
+    class AlwaysConflicting:
+        def load_user(self, username):
+            return store.load_user(username)
+
+        def save_user(self, username, record, expected_version=None):
+            raise storage.VersionConflict(username, expected_version, expected_version + 1)
+
+    with pytest.raises(storage.StorageError):
+        storage.save_merged(AlwaysConflicting(), "alice", None, record(["Read"], {}), max_attempts=3)
@@ -0,0 +1,210 @@
+import atexit
+import copy
+import threading
+import time
+
+import storage
+
+# --- Write-behind Configuration ---
+FLUSH_INTERVAL_SECONDS = 1.0
+RETRY_BACKOFF_SECONDS = 5.0
+_PROGRESS_KINDS = ("progress", "external_progress")
+
+
+class _UserQueue:
+    __slots__ = ("ops", "in_flight", "submitted", "flushed", "external", "conflicts", "last_flush", "last_error", "retry_at")
+
+    def __init__(self):
+        self.ops = []          # [kind, ticket, payload]; adjacent ops of the same kind are coalesced
+        self.in_flight = []    # ops the writer thread has taken but not finished
+        self.submitted = 0     # newest ticket handed out for this user
+        self.flushed = 0       # newest ticket known to be durable
+        self.external = 0      # newest flushed ticket whose merge pulled in someone else's changes
+        self.conflicts = 0
+        self.last_flush = None
+        self.last_error = None
+        self.retry_at = 0.0
+
+
+class WriteBehindQueue:
+    # Saves are queued per user and written by one background thread, so a button click only
+    # pays for a copy of the record. Consecutive progress events for a user collapse into one
+    # journal append (last write per date and goal wins); consecutive record saves from one
+    # source collapse into one merged save from the first base to the last edit. Tickets let
+    # the UI tell which of its writes are durable.
+
+    def __init__(self, store, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._users = {}
+        self._ticket = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+        # Held across a flush pass: without a writer thread, flush() runs on caller threads, and
+        # two passes over one user would apply its ops out of order.
+        self._flush_lock = threading.Lock()
+        self._flush_requested = False
+        self._passes_started = 0
+        self._passes_done = 0
+        self._closed = False
+        self._thread = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    # --- Submitting ---
+    def submit_progress(self, username, events, external=False):
+        # external=True for writers outside the user's browser sessions (e.g. the JSON API):
+        # once flushed, open sessions reload the record as they do after a merge.
+        if not events:
+            return self.status(username)["submitted"]
+        kind = "external_progress" if external else "progress"
+        return self._submit(username, kind, {_event_key(event): event for event in events})
+
+    def submit_record(self, username, base, mine, source=None):
+        # `mine` is copied now: the caller keeps editing its own objects. Saves only coalesce
+        # within one `source` (e.g. a browser session), where each base is the previous edit.
+        return self._submit(username, "record", (copy.deepcopy(base), copy.deepcopy(mine), source))
+
+    def _submit(self, username, kind, payload):
+        with self._lock:
+            if self._closed:
+                raise storage.StorageError("The write-behind queue is closed.")
+            self._ticket += 1
+            queue = self._users.setdefault(username, _UserQueue())
+            queue.submitted = self._ticket
+            last = queue.ops[-1] if queue.ops else None
+            if last is not None and last[0] == kind and kind in _PROGRESS_KINDS:
+                last[2].update(payload)
+                last[1] = self._ticket
+            elif last is not None and last[0] == kind == "record" and last[2][2] is not None and last[2][2] == payload[2]:
+                last[2] = (last[2][0], payload[1], payload[2])
+                last[1] = self._ticket
+            else:
+                queue.ops.append([kind, self._ticket, payload])
+            ticket = self._ticket
+        if self._thread is None:
+            self.flush()
+        return ticket
+
+    # --- Flushing ---
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._flush_requested and not self._closed:
+                    self._wake.wait(self.flush_interval)
+                self._flush_requested = False
+                closing = self._closed
+                self._passes_started += 1
+                started = self._passes_started
+            self._flush_pending()
+            with self._lock:
+                self._passes_done = started
+                self._flushed.notify_all()
+                if closing:
+                    return
+
+    def _flush_pending(self):
+        with self._flush_lock:
+            with self._lock:
+                now = time.monotonic()
+                usernames = [u for u, q in self._users.items() if q.ops and q.retry_at <= now]
+            for username in usernames:
+                self._flush_user(username)
+
+    def _flush_user(self, username):
+        with self._lock:
+            queue = self._users[username]
+            ops, queue.ops = queue.ops, []
+            queue.in_flight = ops
+        for i, (kind, ticket, payload) in enumerate(ops):
+            try:
+                if kind in _PROGRESS_KINDS:
+                    self.store.append_progress(username, list(payload.values()))
+                    external, conflicts = kind == "external_progress", 0
+                else:
+                    base, mine, _ = payload
+                    merged, conflicts = storage.save_merged(self.store, username, base, mine)
+                    external = merged["goals"] != mine["goals"] or merged["daily_progress"] != mine["daily_progress"]
+            except Exception as e:  # kept and retried: a failed write must not be dropped
+                with self._lock:
+                    queue.ops[:0] = ops[i:]
+                    queue.in_flight = []
+                    queue.last_error = f"{type(e).__name__}: {e}"
+                    queue.retry_at = time.monotonic() + RETRY_BACKOFF_SECONDS
+                return
+            with self._lock:
+                queue.flushed = ticket
+                queue.conflicts += conflicts
+                if external or conflicts:
+                    queue.external = ticket
+                queue.last_flush = time.time()
+                queue.last_error = None
+                queue.retry_at = 0.0
+                queue.in_flight = ops[i + 1:]
+
+    def flush(self, timeout=None):
+        # Writes everything queued so far (errors aside); returns True if nothing is left.
+        if self._thread is None or threading.current_thread() is self._thread:
+            with self._lock:
+                for queue in self._users.values():
+                    queue.retry_at = 0.0
+            self._flush_pending()
+        else:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            with self._lock:
+                for queue in self._users.values():
+                    queue.retry_at = 0.0
+                # Wait for a whole pass that started after this call.
+                target = self._passes_started + 1
+                self._flush_requested = True
+                self._wake.notify()
+                while self._passes_done < target and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._flushed.wait(remaining)
+        with self._lock:
+            return not any(q.ops for q in self._users.values())
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self._flush_pending()
+
+    # --- Status ---
+    def has_pending_record(self, username):
+        # True while a record save (e.g. a goal change) for the user is queued or being written.
+        with self._lock:
+            queue = self._users.get(username)
+            return queue is not None and any(op[0] == "record" for op in queue.in_flight + queue.ops)
+
+    def status(self, username):
+        with self._lock:
+            queue = self._users.get(username)
+            if queue is None:
+                return {
+                    "pending": 0, "submitted": 0, "flushed": 0, "external": 0,
+                    "conflicts": 0, "last_flush": None, "last_error": None,
+                }
+            return {
+                "pending": sum(len(op[2]) if op[0] in _PROGRESS_KINDS else 1 for op in queue.in_flight + queue.ops),
+                "submitted": queue.submitted,
+                "flushed": queue.flushed,
+                "external": queue.external,
+                "conflicts": queue.conflicts,
+                "last_flush": queue.last_flush,
+                "last_error": queue.last_error,
+            }
+
+
+def _event_key(event):
+    return event["date"], event["goal"]